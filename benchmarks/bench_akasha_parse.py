@@ -0,0 +1,94 @@
+"""Akasha 深渊统计数据解析基准
+
+对比完整解析 ``AkashaAbyssData.parse_obj`` 与仅选取深渊统计图所需字段的
+``AkashaRenderData`` 解析，统计解析耗时、解析过程内存峰值与解析结果常驻内存。
+JSON 文本解码两者相同，单独列出
+
+    python benchmarks/bench_akasha_parse.py [--file abyss_total.js] [--rounds 50]
+"""
+
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Dict, Callable
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+FIXTURES = Path(__file__).parent / "fixtures"
+"""夹具数据目录"""
+
+
+def measure(func: Callable[[], Any], rounds: int) -> Dict[str, float]:
+    """取各轮墙钟时间中位数，另以 tracemalloc 统计一次调用的内存峰值与返回值常驻内存"""
+
+    func()
+    walls = []
+    for _ in range(rounds):
+        start = perf_counter()
+        func()
+        walls.append(perf_counter() - start)
+
+    tracemalloc.start()
+    result = func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "wall_ms": median(walls) * 1000,
+        "peak_kib": peak / 1024,
+        "retained_kib": retained / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file", default=str(FIXTURES / "abyss_total.js"))
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="gsabyss-bench-")
+    import nonebot
+
+    nonebot.init(gsabyss_dir=data_dir, gsabyss_prerender=False, log_level="WARNING")
+    nonebot.load_plugin("nonebot_plugin_gsabyss")
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    from nonebot_plugin_gsabyss.models.akasha import (
+        AkashaAbyssData,
+        AkashaRenderData,
+        select_render_fields,
+    )
+
+    text = Path(args.file).read_text(encoding="UTF-8")
+    text = text[text.index("{") :]
+    obj = json.loads(text)
+
+    cases = {
+        "JSON 解码": lambda: json.loads(text),
+        "完整 parse_obj": lambda: AkashaAbyssData.parse_obj(obj),
+        "选取字段解析": lambda: AkashaRenderData.parse_obj(select_render_fields(obj)),
+    }
+    results = {name: measure(func, args.rounds) for name, func in cases.items()}
+
+    print(f"数据 {len(text) / 1024:.1f} KiB，轮数 {args.rounds}")
+    print(f"{'基准项':<16}{'耗时 ms':>10}{'峰值 KiB':>12}{'常驻 KiB':>12}")
+    for name, res in results.items():
+        print(
+            f"{name:<16}{res['wall_ms']:>10.3f}"
+            f"{res['peak_kib']:>12.1f}{res['retained_kib']:>12.1f}"
+        )
+    full, lazy = results["完整 parse_obj"], results["选取字段解析"]
+    print(
+        f"选取字段解析耗时为完整解析的 {lazy['wall_ms'] / full['wall_ms']:.1%}，"
+        f"常驻内存为 {lazy['retained_kib'] / full['retained_kib']:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""HHW 深渊数据索引存储基准
+
+将夹具中的日程按倍数扩充以模拟不断增长的历史数据，对比全量解析 JSON
+与索引存储两种方式的冷启动耗时与 Python 内存峰值。
+冷启动指从本地文件加载后读取一期日程及其第 12 层变种
+
+    python benchmarks/bench_hhw_store.py [--scales 10,100,500] [--rounds 5]
+"""
+
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Dict, Callable
+from datetime import datetime, timedelta
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+FIXTURES = Path(__file__).parent / "fixtures"
+"""夹具数据目录"""
+
+
+def build_dataset(scale: int) -> Dict[str, Any]:
+    """按倍数扩充夹具日程，各期依次循环使用夹具中的日程"""
+
+    data = json.loads((FIXTURES / "abyss_hhw.json").read_text(encoding="UTF-8"))
+    templates = list(data["Schedule"].values())
+    schedule, start_time = {}, datetime(2020, 7, 1, 4)
+    for idx in range(len(templates) * scale):
+        schedule[start_time.strftime("%Y-%m-%d %H:%M:%S")] = templates[
+            idx % len(templates)
+        ]
+        start_time = (
+            start_time.replace(day=16)
+            if start_time.day == 1
+            else (start_time + timedelta(days=16)).replace(day=1)
+        )
+    data["Schedule"] = schedule
+    return data
+
+
+def measure(func: Callable[[], Any], rounds: int) -> Dict[str, float]:
+    """取各轮墙钟时间中位数，另以 tracemalloc 单独运行一次统计内存峰值"""
+
+    walls = []
+    for _ in range(rounds):
+        start = perf_counter()
+        func()
+        walls.append(perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"wall_ms": median(walls) * 1000, "peak_kib": peak / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="10,100,500")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="gsabyss-bench-"))
+    import nonebot
+
+    nonebot.init(
+        gsabyss_dir=str(work_dir), gsabyss_prerender=False, log_level="WARNING"
+    )
+    nonebot.load_plugin("nonebot_plugin_gsabyss")
+
+    from nonebot_plugin_gsabyss.hhw_store import HHWStore, write_store
+    from nonebot_plugin_gsabyss.models.hhw import VariantModel, ScheduleItemModel
+
+    print(f"{'日程数':>8}{'JSON KiB':>10}{'全量 ms':>10}{'全量 KiB':>10}", end="")
+    print(f"{'写入 ms':>10}{'存储 ms':>10}{'存储 KiB':>10}")
+    try:
+        for scale in [int(s) for s in args.scales.split(",")]:
+            data = build_dataset(scale)
+            json_path, db_path = work_dir / f"{scale}.json", work_dir / f"{scale}.db"
+            json_path.write_text(json.dumps(data, ensure_ascii=False), "UTF-8")
+            schedule_key = list(data["Schedule"])[-1]
+
+            def full_parse() -> None:
+                raw = json.loads(json_path.read_text(encoding="UTF-8"))
+                variants = {
+                    (int(f), int(v)): VariantModel.parse_obj(variant)
+                    for f, floor in raw["Floor"].items()
+                    for v, variant in floor.items()
+                }
+                schedules = {
+                    k: ScheduleItemModel.parse_obj(s)
+                    for k, s in raw["Schedule"].items()
+                }
+                floor_12 = schedules[schedule_key].arrangement.floor_12
+                assert variants[(12, floor_12)]
+
+            def store_lookup() -> None:
+                store = HHWStore(db_path)
+                floor_12 = store.schedules[schedule_key].arrangement.floor_12
+                assert store.variants[(12, floor_12)]
+                store.close()
+
+            start = perf_counter()
+            write_store(db_path, data, "bench")
+            ingest = (perf_counter() - start) * 1000
+            full, stored = measure(full_parse, args.rounds), measure(
+                store_lookup, args.rounds
+            )
+            print(
+                f"{len(data['Schedule']):>8}{json_path.stat().st_size / 1024:>10.0f}"
+                f"{full['wall_ms']:>10.1f}{full['peak_kib']:>10.0f}"
+                f"{ingest:>10.1f}{stored['wall_ms']:>10.2f}{stored['peak_kib']:>10.0f}"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""已校验数据构造基准
+
+对比完整校验 ``parse_obj`` 与跳过校验的 ``construct_trusted`` 构造深渊数据模型，
+统计单个对象的构造耗时与常驻内存。``construct_trusted`` 的输入为写入时经校验器
+转换并存储的记录，两种方式的 JSON 文本解码相同，不计入统计
+
+    python benchmarks/bench_models.py [--rounds 200]
+"""
+
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any, Dict, List, Callable
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+FIXTURES = Path(__file__).parent / "fixtures"
+"""夹具数据目录"""
+
+
+def measure(
+    build: Callable[[Dict[str, Any]], Any], items: List[Dict[str, Any]], rounds: int
+) -> Dict[str, float]:
+    """取各轮构造全部数据的墙钟时间中位数，另以 tracemalloc 统计构造结果常驻内存。
+    均按单个对象计
+    """
+
+    walls = []
+    for _ in range(rounds):
+        start = perf_counter()
+        for item in items:
+            build(item)
+        walls.append(perf_counter() - start)
+
+    tracemalloc.start()
+    results = [build(item) for item in items]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return {
+        "wall_us": median(walls) / len(items) * 1e6,
+        "retained_b": retained / len(items),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="gsabyss-bench-")
+    import nonebot
+
+    nonebot.init(gsabyss_dir=data_dir, gsabyss_prerender=False, log_level="WARNING")
+    nonebot.load_plugin("nonebot_plugin_gsabyss")
+    shutil.rmtree(data_dir, ignore_errors=True)
+
+    from nonebot_plugin_gsabyss.models.trusted import construct_trusted
+    from nonebot_plugin_gsabyss.models.akasha import TeamItem, CharacterItem
+    from nonebot_plugin_gsabyss.models.hhw import VariantModel, ScheduleItemModel
+
+    hhw = json.loads((FIXTURES / "abyss_hhw.json").read_text(encoding="UTF-8"))
+    akasha = (FIXTURES / "abyss_total.js").read_text(encoding="UTF-8")
+    akasha = json.loads(akasha[akasha.index("{") :])
+    cases: Dict[str, Any] = {
+        "VariantModel": (
+            VariantModel,
+            [v for floor in hhw["Floor"].values() for v in floor.values()],
+        ),
+        "ScheduleItemModel": (ScheduleItemModel, list(hhw["Schedule"].values())),
+        "TeamItem": (TeamItem, akasha["team_list"]),
+        "CharacterItem": (CharacterItem, akasha["character_used_list"]),
+    }
+
+    print(f"轮数 {args.rounds}，按单个对象计")
+    print(f"{'模型':<20}{'数量':>6}{'校验 μs':>10}{'构造 μs':>10}", end="")
+    print(f"{'校验 B':>10}{'构造 B':>10}")
+    for name, (model, raws) in cases.items():
+        # 与存储相同，使用经校验器转换后的记录
+        trusted = [json.loads(model.parse_obj(raw).json()) for raw in raws]
+        validated = measure(model.parse_obj, raws, args.rounds)
+        constructed = measure(
+            lambda data: construct_trusted(model, data), trusted, args.rounds
+        )
+        print(
+            f"{name:<20}{len(raws):>6}"
+            f"{validated['wall_us']:>10.1f}{constructed['wall_us']:>10.1f}"
+            f"{validated['retained_b']:>10.0f}{constructed['retained_b']:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""绘图流程基准
+
+使用 ``benchmarks/fixtures`` 中的夹具数据离线绘制深渊速览图与深渊统计图，
+统计各入口与各绘制阶段的墙钟时间、CPU 时间与 Python 内存峰值。
+网络请求全部被拦截，出现任何对外请求时基准失败
+
+夹具为按插件数据结构生成的精简数据，图标为示意图。字体文件不随仓库分发，
+需从已完成初始化的插件数据目录复制。绘图缓存已关闭，已缩放图标缓存保持启用
+
+    python benchmarks/bench_render.py [--font-dir data/gsabyss] [--rounds 10]
+        [--json result.json] [--compare baseline.json]
+"""
+
+import sys
+import json
+import shutil
+import asyncio
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from pathlib import Path
+from statistics import median
+from time import perf_counter, process_time
+from typing import Any, Dict, List, Tuple, Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+FIXTURES = Path(__file__).parent / "fixtures"
+"""夹具数据目录"""
+
+FONTS = ["HYWH-85W.ttf", "SmileySans-Oblique.ttf"]
+"""需要复制的字体文件"""
+
+SCHEDULE_KEY = "2021-03-16 04:00:00"
+"""夹具数据中的深境螺旋日程"""
+
+QUICKVIEW_INPUTS = ["", "12", "十二层", "12-3", "上期", "下期 11", "9-1 本期", "第十层", "9-12"]
+"""速览命令参数样例"""
+
+
+def prepare_dir(font_dir: Path) -> Path:
+    """创建临时插件数据目录，复制夹具数据与字体"""
+
+    missing = [name for name in FONTS if not (font_dir / name).exists()]
+    if missing:
+        sys.exit(f"字体目录 {font_dir} 中缺少 {'、'.join(missing)}，请通过 --font-dir 指定")
+
+    data_dir = Path(tempfile.mkdtemp(prefix="gsabyss-bench-"))
+    for name in FONTS:
+        shutil.copy(font_dir / name, data_dir / name)
+    shutil.copy(FIXTURES / "abyss_hhw.json", data_dir / "abyss_hhw.json")
+    for item in (FIXTURES / "icons").iterdir():
+        if item.is_dir():
+            shutil.copytree(item, data_dir / item.name)
+        else:
+            shutil.copy(item, data_dir / item.name)
+    return data_dir
+
+
+def stub_network(data_source: Any) -> List[str]:
+    """以拦截全部请求的客户端替换插件共享 HTTP 客户端
+
+    - ``return: List[str]`` 被拦截的请求 URL
+    """
+
+    import httpx
+
+    intercepted: List[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        intercepted.append(str(request.url))
+        return httpx.Response(503)
+
+    data_source._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return intercepted
+
+
+def measure(func: Callable[[], Any], rounds: int, number: int = 1) -> Dict[str, float]:
+    """测量单个基准项。预热一次后取各轮中位数，另以 tracemalloc 单独运行一次统计内存峰值
+
+    * ``param func: Callable[[], Any]`` 基准函数
+    * ``param rounds: int`` 轮数
+    * ``param number: int = 1`` 每轮调用次数。结果按单次调用折算
+    - ``return: Dict[str, float]`` 墙钟时间、CPU 时间（毫秒）与内存峰值（KiB）
+    """
+
+    func()
+    walls, cpus = [], []
+    for _ in range(rounds):
+        wall_start, cpu_start = perf_counter(), process_time()
+        for _ in range(number):
+            func()
+        walls.append((perf_counter() - wall_start) / number)
+        cpus.append((process_time() - cpu_start) / number)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "wall_ms": median(walls) * 1000,
+        "cpu_ms": median(cpus) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def build_cases(loop: asyncio.AbstractEventLoop) -> List[Tuple[str, Callable, int]]:
+    """构建基准项列表
+
+    - ``return: List[Tuple[str, Callable, int]]`` 基准项名称、基准函数、每轮调用次数
+    """
+
+    from nonebot_plugin_gsabyss.models.akasha import AkashaAbyssData
+    from nonebot_plugin_gsabyss.data_source import parse_quickview_input
+    from nonebot_plugin_gsabyss.draw_statistic import AbyssStatisticDraw
+    from nonebot_plugin_gsabyss.draw_quickview import (
+        AbyssQuickViewDraw,
+        AbyssBatchQuickViewDraw,
+    )
+
+    akasha_text = (FIXTURES / "abyss_total.js").read_text(encoding="UTF-8")
+    akasha_data = AkashaAbyssData.parse_obj(
+        json.loads(akasha_text[akasha_text.index("{") :])
+    )
+
+    floor = AbyssQuickViewDraw(12, 0, SCHEDULE_KEY)
+    chamber = AbyssQuickViewDraw(12, 1, SCHEDULE_KEY)
+    floors = [
+        AbyssQuickViewDraw(floor_id, 0, SCHEDULE_KEY) for floor_id in range(9, 13)
+    ]
+    batch = AbyssBatchQuickViewDraw(list(range(9, 13)), SCHEDULE_KEY)
+    variant_data, schedule_data = floor.lookup()
+    assert variant_data and schedule_data, f"夹具数据缺少日程 {SCHEDULE_KEY}"
+    chamber_data = variant_data.chambers[0]
+    statistic = AbyssStatisticDraw(akasha_data)
+
+    def run(coro_func: Callable) -> Callable[[], Any]:
+        def _run() -> Any:
+            res = loop.run_until_complete(coro_func())
+            assert not isinstance(res, str), res
+            return res
+
+        return _run
+
+    async def each_floor() -> List[Any]:
+        return [await drawer.get_full_picture() for drawer in floors]
+
+    return [
+        (
+            "parse_quickview_input",
+            lambda: [parse_quickview_input(s) for s in QUICKVIEW_INPUTS],
+            100,
+        ),
+        ("速览 单间 get_full_picture", run(chamber.get_full_picture), 1),
+        ("速览 全层 get_full_picture", run(floor.get_full_picture), 1),
+        ("速览 9 至 12 层分别 get_full_picture", run(each_floor), 1),
+        ("速览 9-12 合并 get_full_picture", run(batch.get_full_picture), 1),
+        (
+            "速览 draw_header",
+            lambda: floor.draw_header(schedule_data.blessing, variant_data.disorders),
+            1,
+        ),
+        (
+            "速览 draw_chamber_top",
+            lambda: floor.draw_chamber_top(
+                chamber_data.conditions, chamber_data.reward, 1
+            ),
+            1,
+        ),
+        (
+            "速览 draw_chamber_middle",
+            lambda: floor.draw_chamber_middle(
+                chamber_data.monster_lvl_overwrite, chamber_data.monsters
+            ),
+            1,
+        ),
+        (
+            "速览 draw_chamber_buttom",
+            lambda: floor.draw_chamber_buttom(chamber_data.possible_buff),
+            1,
+        ),
+        ("速览 draw_chamber", lambda: floor.draw_chamber(chamber_data, 1), 1),
+        ("速览 全层 render", lambda: floor.render(variant_data, schedule_data), 1),
+        ("统计 get_full_picture", run(statistic.get_full_picture), 1),
+        (
+            "统计 draw_top",
+            lambda: statistic.draw_top(
+                akasha_data.modify_time,
+                akasha_data.schedule_version_desc,
+                akasha_data.abyss_total_view,
+                akasha_data.last_rate,
+            ),
+            1,
+        ),
+        (
+            "统计 draw_middle",
+            lambda: statistic.draw_middle(akasha_data.character_used_list),
+            1,
+        ),
+        (
+            "统计 draw_buttom",
+            lambda: statistic.draw_buttom(
+                akasha_data.team_up_list,
+                akasha_data.team_down_list,
+                akasha_data.character_used_list,
+            ),
+            1,
+        ),
+        ("统计 render", statistic.render, 1),
+    ]
+
+
+def report(
+    results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Any]]
+) -> None:
+    """输出基准结果。指定基准线时附带墙钟时间比值"""
+
+    name_width = max(len(name) for name in results) + 2
+    header = f"{'基准项':<{name_width}}{'墙钟 ms':>10}{'CPU ms':>10}{'峰值 KiB':>12}"
+    print(header + (f"{'对比':>10}" if baseline else ""))
+    for name, res in results.items():
+        line = (
+            f"{name:<{name_width}}{res['wall_ms']:>10.3f}"
+            f"{res['cpu_ms']:>10.3f}{res['peak_kib']:>12.1f}"
+        )
+        if baseline and name in baseline["results"]:
+            line += f"{res['wall_ms'] / baseline['results'][name]['wall_ms']:>9.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--font-dir", default="data/gsabyss")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    parser.add_argument("--compare", help="与此前写入的 JSON 结果对比")
+    args = parser.parse_args()
+
+    data_dir = prepare_dir(Path(args.font_dir))
+    try:
+        import nonebot
+
+        nonebot.init(
+            gsabyss_dir=str(data_dir),
+            gsabyss_render_cache_size=0,
+            gsabyss_tile_cache_size=0,
+            gsabyss_prerender=False,
+            log_level="WARNING",
+        )
+        nonebot.load_plugin("nonebot_plugin_gsabyss")
+
+        from PIL import __version__ as pillow_version
+
+        from nonebot_plugin_gsabyss import data_source
+
+        intercepted = stub_network(data_source)
+        loop = asyncio.new_event_loop()
+        results = {
+            name: measure(func, args.rounds, number)
+            for name, func, number in build_cases(loop)
+        }
+        loop.close()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if intercepted:
+        sys.exit(f"基准期间出现对外请求：{intercepted}")
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="UTF-8"))
+    print(f"Python {sys.version.split()[0]}，Pillow {pillow_version}，轮数 {args.rounds}")
+    report(results, baseline)
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"进程最大常驻内存 {max_rss:.1f} MiB")
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(
+                {"rounds": args.rounds, "max_rss_mib": max_rss, "results": results},
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="UTF-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""文本排版微基准
+
+对比逐字 ``_coord_calc`` + ``drawer.text`` 的旧绘制方式与 ``layout_text`` 整段绘制，
+两者换行结果必须一致。字体文件需已存在于 ``gsabyss_dir`` 中
+
+    python benchmarks/bench_text_layout.py [--gsabyss-dir data/gsabyss] [--rounds 200]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from timeit import timeit
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+PARAGRAPH = (
+    "处于深境螺旋中时，队伍中的角色施放元素爆发后，会在当前场上角色的位置产生一道冲击波，"
+    "对周围的敌人造成伤害。该效果每3秒至多触发一次。"
+    "角色的普通攻击、重击与下落攻击命中敌人后，会使该角色造成的伤害提升5%，持续10秒，"
+    "该效果至多叠加5层。"
+)
+
+
+def legacy_draw(drawer, text: str, font, line_height: int, max_width: int) -> int:
+    """旧绘制方式：逐字测量宽度并逐字绘制"""
+
+    _width, height_acul = 0, 0
+    for s in text:
+        if _width + font.getlength(s) <= max_width:
+            coord_x = _width
+            _width += font.getlength(s)
+        else:
+            coord_x, _width = 0, font.getlength(s)
+            height_acul += line_height + 10
+        drawer.text((coord_x, height_acul), s, fill="#EBE5D9", font=font)
+    return height_acul
+
+
+def legacy_positions(text: str, font, line_height: int, max_width: int):
+    """旧绘制方式的逐字坐标，用于校验换行结果"""
+
+    positions: List[Tuple[float, int]] = []
+    _width, height_acul = 0.0, 0
+    for s in text:
+        if _width + font.getlength(s) <= max_width:
+            positions.append((_width, height_acul))
+            _width += font.getlength(s)
+        else:
+            height_acul += line_height + 10
+            positions.append((0, height_acul))
+            _width = font.getlength(s)
+    return positions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gsabyss-dir", default="data/gsabyss")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    import nonebot
+
+    nonebot.init(gsabyss_dir=args.gsabyss_dir)
+    nonebot.load_plugin("nonebot_plugin_gsabyss")
+
+    from PIL import Image, ImageDraw
+
+    from nonebot_plugin_gsabyss.draw_utils import (
+        font,
+        char_height,
+        layout_text,
+        draw_segments,
+        glyph_advance,
+    )
+
+    text = PARAGRAPH * 2
+    _font, line_height = font(20), char_height(20)
+
+    # 校验换行结果一致
+    segments, _, _ = layout_text([(text, "#EBE5D9")], 0, 0, 530)
+    positions = legacy_positions(text, _font, line_height, 530)
+    merged: List[Tuple[float, int]] = []
+    for x, y, seg_text, _ in segments:
+        for s in seg_text:
+            merged.append((x, y))
+            x += glyph_advance(s)
+    assert merged == positions, "layout_text 换行结果与旧绘制方式不一致"
+
+    def run_legacy() -> None:
+        img = Image.new("RGBA", (530, 400))
+        legacy_draw(ImageDraw.Draw(img), text, _font, line_height, 530)
+
+    def run_layout() -> None:
+        img = Image.new("RGBA", (530, 400))
+        segments, _, _ = layout_text([(text, "#EBE5D9")], 0, 0, 530)
+        draw_segments(ImageDraw.Draw(img), segments)
+
+    legacy_time = timeit(run_legacy, number=args.rounds) / args.rounds
+    layout_time = timeit(run_layout, number=args.rounds) / args.rounds
+    print(f"文本长度 {len(text)}，片段数 {len(segments)}，轮数 {args.rounds}")
+    print(f"逐字绘制   {legacy_time * 1000:8.3f} ms/次")
+    print(f"整段绘制   {layout_time * 1000:8.3f} ms/次")
+    print(f"加速比     {legacy_time / layout_time:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
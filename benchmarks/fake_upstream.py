@@ -0,0 +1,191 @@
+"""本地模拟上游服务
+
+以 ``benchmarks/fixtures`` 中的夹具数据模拟 HHW 深渊数据、初始化资源、
+Akasha Database 深渊统计数据与各类图标下载，可注入延迟、错误率并控制 ETag 行为，
+用于压测与长时间运行测试。启动后按输出的配置项将插件指向本服务
+
+    python benchmarks/fake_upstream.py [--port 8900] [--latency 50] [--jitter 20]
+        [--error-rate 0.05] [--no-etag] [--font-dir data/gsabyss]
+
+HHW 深渊数据的日程会从 2020 年 7 月上半月一直补齐到下期，
+各期依次循环使用夹具中的日程，使 ``本期`` 与 ``下期`` 均可查询。
+字体文件不随仓库分发，未指定 ``--font-dir`` 时字体请求返回 404
+"""
+
+import json
+import random
+import argparse
+from time import sleep
+from hashlib import md5
+from pathlib import Path
+from threading import Lock
+from datetime import datetime, timedelta
+from typing import Dict, Tuple, Optional
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIXTURES = Path(__file__).parent / "fixtures"
+"""夹具数据目录"""
+
+ICONS = FIXTURES / "icons"
+"""夹具图标目录"""
+
+START_TIME = datetime(2020, 7, 1, 4)
+"""首期深境螺旋日程开始时间"""
+
+
+def build_hhw_payload() -> bytes:
+    """生成 HHW 深渊数据。日程从首期补齐至下期"""
+
+    data = json.loads((FIXTURES / "abyss_hhw.json").read_text(encoding="UTF-8"))
+    templates = list(data["Schedule"].values())
+    schedule, start_time, until = {}, START_TIME, datetime.now() + timedelta(days=16)
+    while start_time <= until:
+        schedule[start_time.strftime("%Y-%m-%d %H:%M:%S")] = templates[
+            len(schedule) % len(templates)
+        ]
+        start_time = (
+            start_time.replace(day=16)
+            if start_time.day == 1
+            else (start_time + timedelta(days=16)).replace(day=1)
+        )
+    data["Schedule"] = schedule
+    return json.dumps(data, ensure_ascii=False).encode("UTF-8")
+
+
+class Upstream:
+    """模拟上游状态。统计请求数量"""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.hhw = build_hhw_payload()
+        self.akasha = (FIXTURES / "abyss_total.js").read_bytes()
+        self.last_modified = formatdate(usegmt=True)
+        self.font_dir: Optional[Path] = Path(args.font_dir) if args.font_dir else None
+        akasha_json = json.loads(self.akasha[self.akasha.index(b"{") :])
+        self.char_names = {
+            c["en_name"]: c["name"] for c in akasha_json["character_used_list"]
+        }
+        self.counter: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.counter[key] = self.counter.get(key, 0) + 1
+
+    def resolve(self, path: str) -> Tuple[Optional[bytes], str]:
+        """根据请求路径获取响应内容
+
+        - ``return: Tuple[Optional[bytes], str]`` 响应内容、内容类型。未找到时内容为空
+        """
+
+        if path == "/data/abyss.json":
+            return self.hhw, "application/json"
+        if path.startswith("/data/"):
+            name = path[len("/data/") :]
+            if name.endswith(".ttf"):
+                font = self.font_dir / name if self.font_dir else None
+                return (
+                    font.read_bytes() if font and font.exists() else None
+                ), "font/ttf"
+            icon = ICONS / name
+            return (icon.read_bytes() if icon.exists() else None), "image/png"
+        if path == "/akasha/abyss_total.js":
+            return self.akasha, "application/javascript"
+        if path.startswith("/akasha-icon/"):
+            en_name = Path(path).stem
+            icon = ICONS / "char" / f"{self.char_names.get(en_name, '')}.png"
+            return (icon.read_bytes() if icon.exists() else None), "image/png"
+        if path.startswith("/hhw/"):
+            # 夹具图标以名称命名，HHW 图标按文件名散列到同类图标
+            kind = "reward" if Path(path).name.startswith("r") else "monster"
+            icons = sorted((ICONS / kind).iterdir())
+            digest = int(md5(path.encode("UTF-8")).hexdigest(), 16)
+            return icons[digest % len(icons)].read_bytes(), "image/png"
+        return None, ""
+
+
+def make_handler(upstream: Upstream):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args) -> None:
+            if upstream.args.verbose:
+                super().log_message(format, *args)
+
+        def reply(self, status: int, body: bytes = b"", headers=None) -> None:
+            self.send_response(status)
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body and self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            args = upstream.args
+            path = self.path.split("?", 1)[0]
+            if args.latency or args.jitter:
+                delay = args.latency + random.uniform(-args.jitter, args.jitter)
+                sleep(max(delay, 0) / 1000)
+            if random.random() < args.error_rate:
+                upstream.count("error")
+                return self.reply(503, b"injected error")
+
+            body, content_type = upstream.resolve(path)
+            if body is None:
+                upstream.count("404")
+                return self.reply(404, b"not found")
+
+            headers = {"Content-Type": content_type}
+            if not args.no_etag:
+                etag = f'"{md5(body).hexdigest()}"'
+                headers.update({"ETag": etag, "Last-Modified": upstream.last_modified})
+                if self.headers.get("If-None-Match") == etag or (
+                    self.headers.get("If-Modified-Since")
+                    and parsedate_to_datetime(self.headers["If-Modified-Since"])
+                    >= parsedate_to_datetime(upstream.last_modified)
+                ):
+                    upstream.count("304")
+                    return self.reply(304, headers=headers)
+            upstream.count("200")
+            self.reply(200, body, headers)
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0, help="平均延迟，单位毫秒")
+    parser.add_argument("--jitter", type=float, default=0, help="延迟抖动，单位毫秒")
+    parser.add_argument("--error-rate", type=float, default=0, help="返回 503 的概率")
+    parser.add_argument(
+        "--no-etag", action="store_true", help="不返回 ETag 与 Last-Modified"
+    )
+    parser.add_argument("--font-dir", help="提供字体文件的目录")
+    parser.add_argument("--verbose", action="store_true", help="输出请求日志")
+    args = parser.parse_args()
+
+    upstream = Upstream(args)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(upstream))
+    base = f"http://{args.host}:{args.port}"
+    print("模拟上游已启动，插件配置：")
+    print(f"GSABYSS_DATA_URL={base}/data/")
+    print(f"GSABYSS_AKASHA_URL={base}/akasha/abyss_total.js")
+    print(f"GSABYSS_AKASHA_ICON_URL={base}/akasha-icon/")
+    print(f"GSABYSS_HHW_MIRROR={base}/hhw/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"请求统计：{upstream.counter}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+var static_abyss_total ={"schedule_id": 10034, "modify_time": "2023-02-10 12:00", "schedule_version_desc": "3.4版本上半", "team_list": [{"ac": 3823, "mr": "88.1", "uc": "7418", "dc": "1277", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [32, 2, 30, 26]}, {"ac": 4901, "mr": "88.1", "uc": "161", "dc": "4746", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [11, 33, 22, 29]}, {"ac": 8021, "mr": "88.1", "uc": "8235", "dc": "2074", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [22, 9, 31, 29]}, {"ac": 675, "mr": "88.1", "uc": "6740", "dc": "3168", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [6, 23, 4, 26]}, {"ac": 2548, "mr": "88.1", "uc": "2335", "dc": "909", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [13, 24, 26, 32]}, {"ac": 6829, "mr": "88.1", "uc": "8950", "dc": "6675", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [8, 13, 31, 5]}, {"ac": 2088, "mr": "88.1", "uc": "8707", "dc": "4217", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [27, 28, 7, 21]}, {"ac": 3023, "mr": "88.1", "uc": "605", "dc": "6678", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [12, 18, 11, 30]}, {"ac": 7095, "mr": "88.1", "uc": "2954", "dc": "3164", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [23, 13, 14, 4]}, {"ac": 3646, "mr": "88.1", "uc": "4487", "dc": "7876", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [21, 23, 12, 5]}], "team_up_list": [{"ac": 4125, "mr": "88.1", "uc": "4607", "dc": "4241", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [16, 8, 15, 26]}, {"ac": 4763, "mr": "88.1", "uc": "8125", "dc": "6085", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [20, 7, 21, 22]}, {"ac": 4998, "mr": "88.1", "uc": "6463", "dc": "4772", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [16, 13, 14, 25]}, {"ac": 1456, "mr": "88.1", "uc": "7075", "dc": "4734", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [3, 19, 5, 13]}, {"ac": 2297, "mr": "88.1", "uc": "5480", "dc": "1103", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [2, 32, 4, 9]}, {"ac": 3241, "mr": "88.1", "uc": "1715", "dc": "1675", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [3, 2, 13, 17]}, {"ac": 7465, "mr": "88.1", "uc": "8475", "dc": "2930", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [4, 6, 32, 17]}, {"ac": 3984, "mr": "88.1", "uc": "5814", "dc": "6568", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [6, 8, 9, 16]}, {"ac": 1048, "mr": "88.1", "uc": "5131", "dc": "7827", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [14, 26, 4, 13]}, {"ac": 3149, "mr": "88.1", "uc": "4101", "dc": "511", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [26, 33, 22, 6]}], "team_down_list": [{"ac": 1076, "mr": "88.1", "uc": "4936", "dc": "2987", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [31, 33, 5, 7]}, {"ac": 5995, "mr": "88.1", "uc": "6396", "dc": "4973", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [5, 23, 2, 8]}, {"ac": 4796, "mr": "88.1", "uc": "3021", "dc": "3715", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [11, 25, 9, 4]}, {"ac": 4394, "mr": "88.1", "uc": "3729", "dc": "1460", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [5, 11, 16, 26]}, {"ac": 4764, "mr": "88.1", "uc": "1104", "dc": "725", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [31, 10, 21, 25]}, {"ac": 6148, "mr": "88.1", "uc": "1567", "dc": "4580", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [25, 15, 27, 21]}, {"ac": 5907, "mr": "88.1", "uc": "6228", "dc": "4099", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [16, 13, 29, 2]}, {"ac": 8611, "mr": "88.1", "uc": "8613", "dc": "4464", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [8, 10, 33, 21]}, {"ac": 8298, "mr": "88.1", "uc": "5843", "dc": "6877", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [8, 6, 13, 26]}, {"ac": 1870, "mr": "88.1", "uc": "4535", "dc": "4632", "ud": "1.2", "umr": "91.2", "dmr": "87.3", "tl": [8, 4, 14, 2]}], "abyss_total_view": {"avg_star": "30.1", "avg_battle_count": "14.2", "avg_maxstar_battle_count": "12.9", "pass_rate": "91.1", "maxstar_rate": "71.2", "maxstar_12_rate": "44.1", "person_war": 123456, "person_pass": 100000, "maxstar_person": 80000}, "last_rate": {"avg_star": "0.2", "pass_rate": "-1.1", "maxstar_rate": "0.7", "avg_battle_count": "-0.3", "avg_maxstar_battle_count": "0.1", "maxstar_12_rate": "2.2"}, "level_data": {"player_level_data": {"maxstar_player_data": {"title": "满星率", "y_list": ["50.1", "50.1", "50.1", "50.1", "50.1", "50.1"], "x_list": ["Lv.55", "Lv.56", "Lv.57", "Lv.58", "Lv.59", "Lv.60"]}, "pass_player_data": {"title": "通关率", "y_list": ["70.1", "70.1", "70.1", "70.1", "70.1", "70.1"], "x_list": ["Lv.55", "Lv.56", "Lv.57", "Lv.58", "Lv.59", "Lv.60"]}}, "palyer_count_level_data": {"player_count_data": [1000, 1000, 1000, 1000, 1000, 1000], "level_data": ["Lv.55", "Lv.56", "Lv.57", "Lv.58", "Lv.59", "Lv.60"]}}, "character_used_list": [{"avatar_id": 10000002, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 90.0, "used_index": 1, "name": "角色00", "en_name": "char00", "icon": "Char00", "element": "cryo", "rarity": 4}, {"avatar_id": 10000003, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 87.9, "used_index": 2, "name": "角色01", "en_name": "char01", "icon": "Char01", "element": "geo", "rarity": 4}, {"avatar_id": 10000004, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 85.8, "used_index": 3, "name": "角色02", "en_name": "char02", "icon": "Char02", "element": "cryo", "rarity": 5}, {"avatar_id": 10000005, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 83.7, "used_index": 4, "name": "角色03", "en_name": "char03", "icon": "Char03", "element": "hydro", "rarity": 5}, {"avatar_id": 10000006, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 81.6, "used_index": 5, "name": "角色04", "en_name": "char04", "icon": "Char04", "element": "pyro", "rarity": 5}, {"avatar_id": 10000007, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 79.5, "used_index": 6, "name": "角色05", "en_name": "char05", "icon": "Char05", "element": "dendro", "rarity": 5}, {"avatar_id": 10000008, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 77.4, "used_index": 7, "name": "角色06", "en_name": "char06", "icon": "Char06", "element": "hydro", "rarity": 4}, {"avatar_id": 10000009, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 75.3, "used_index": 8, "name": "角色07", "en_name": "char07", "icon": "Char07", "element": "cryo", "rarity": 5}, {"avatar_id": 10000010, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 73.2, "used_index": 9, "name": "角色08", "en_name": "char08", "icon": "Char08", "element": "electro", "rarity": 4}, {"avatar_id": 10000011, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 71.1, "used_index": 10, "name": "角色09", "en_name": "char09", "icon": "Char09", "element": "pyro", "rarity": 4}, {"avatar_id": 10000012, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 69.0, "used_index": 11, "name": "角色10", "en_name": "char10", "icon": "Char10", "element": "pyro", "rarity": 4}, {"avatar_id": 10000013, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 66.9, "used_index": 12, "name": "角色11", "en_name": "char11", "icon": "Char11", "element": "hydro", "rarity": 4}, {"avatar_id": 10000014, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 64.8, "used_index": 13, "name": "角色12", "en_name": "char12", "icon": "Char12", "element": "geo", "rarity": 4}, {"avatar_id": 10000015, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 62.7, "used_index": 14, "name": "角色13", "en_name": "char13", "icon": "Char13", "element": "geo", "rarity": 4}, {"avatar_id": 10000016, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 60.6, "used_index": 15, "name": "角色14", "en_name": "char14", "icon": "Char14", "element": "cryo", "rarity": 4}, {"avatar_id": 10000017, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 58.5, "used_index": 16, "name": "角色15", "en_name": "char15", "icon": "Char15", "element": "pyro", "rarity": 4}, {"avatar_id": 10000018, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 56.4, "used_index": 17, "name": "角色16", "en_name": "char16", "icon": "Char16", "element": "anemo", "rarity": 4}, {"avatar_id": 10000019, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 54.3, "used_index": 18, "name": "角色17", "en_name": "char17", "icon": "Char17", "element": "hydro", "rarity": 4}, {"avatar_id": 10000020, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 52.2, "used_index": 19, "name": "角色18", "en_name": "char18", "icon": "Char18", "element": "cryo", "rarity": 4}, {"avatar_id": 10000021, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 50.1, "used_index": 20, "name": "角色19", "en_name": "char19", "icon": "Char19", "element": "geo", "rarity": 5}, {"avatar_id": 10000022, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 48.0, "used_index": 21, "name": "角色20", "en_name": "char20", "icon": "Char20", "element": "hydro", "rarity": 4}, {"avatar_id": 10000023, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 45.9, "used_index": 22, "name": "角色21", "en_name": "char21", "icon": "Char21", "element": "electro", "rarity": 4}, {"avatar_id": 10000024, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 43.8, "used_index": 23, "name": "角色22", "en_name": "char22", "icon": "Char22", "element": "cryo", "rarity": 4}, {"avatar_id": 10000025, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 41.7, "used_index": 24, "name": "角色23", "en_name": "char23", "icon": "Char23", "element": "cryo", "rarity": 4}, {"avatar_id": 10000026, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 39.6, "used_index": 25, "name": "角色24", "en_name": "char24", "icon": "Char24", "element": "dendro", "rarity": 5}, {"avatar_id": 10000027, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 37.5, "used_index": 26, "name": "角色25", "en_name": "char25", "icon": "Char25", "element": "dendro", "rarity": 4}, {"avatar_id": 10000028, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 35.4, "used_index": 27, "name": "角色26", "en_name": "char26", "icon": "Char26", "element": "anemo", "rarity": 4}, {"avatar_id": 10000029, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 33.3, "used_index": 28, "name": "角色27", "en_name": "char27", "icon": "Char27", "element": "hydro", "rarity": 5}, {"avatar_id": 10000030, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 31.2, "used_index": 29, "name": "角色28", "en_name": "char28", "icon": "Char28", "element": "electro", "rarity": 5}, {"avatar_id": 10000031, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 29.1, "used_index": 30, "name": "角色29", "en_name": "char29", "icon": "Char29", "element": "cryo", "rarity": 4}, {"avatar_id": 10000032, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 27.0, "used_index": 31, "name": "角色30", "en_name": "char30", "icon": "Char30", "element": "anemo", "rarity": 5}, {"avatar_id": 10000033, "maxstar_person_had_count": 1000, "maxstar_person_use_count": 500, "value": 24.9, "used_index": 32, "name": "角色31", "en_name": "char31", "icon": "Char31", "element": "hydro", "rarity": 4}]}
\ No newline at end of file
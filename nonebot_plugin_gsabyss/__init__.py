@@ -1,34 +1,76 @@
 from nonebot.params import CommandArg
 from nonebot.plugin import on_command
+from nonebot.permission import SUPERUSER
 from nonebot.adapters.onebot.v11 import Message, MessageSegment
 
+from .metrics import metrics
 from .config import plugin_config
-from .draw_quickview import AbyssQuickViewDraw
+from . import prerender  # noqa: F401
+from .profiler import PROFILE_DIR, profiler
 from .draw_statistic import AbyssStatisticDraw
 from .data_source import fetch_akasha_abyss, parse_quickview_input
+from .draw_quickview import AbyssQuickViewDraw, AbyssBatchQuickViewDraw
 
 PRIORITY = plugin_config.gsabyss_priority
 quickview_matcher = on_command("速览", aliases={"深渊速览"}, priority=PRIORITY, block=True)
 totalview_matcher = on_command("深渊统计", priority=PRIORITY, block=True)
+profile_matcher = on_command(
+    "深渊分析", permission=SUPERUSER, priority=PRIORITY, block=True
+)
 
 
 @quickview_matcher.handle()
 async def abyssQuick(arg: Message = CommandArg()):
-    floor_idx, chamber_idx, schedule_key = parse_quickview_input(str(arg))
-    drawer = AbyssQuickViewDraw(floor_idx, chamber_idx, schedule_key)
-    res = await drawer.get_full_picture()
-    await quickview_matcher.finish(
-        res if isinstance(res, str) else MessageSegment.image(res)
-    )
+    parsed = parse_quickview_input(str(arg))
+    if isinstance(parsed, str):
+        await quickview_matcher.finish(parsed)
+    floor_ids, chamber_idx, schedule_key = parsed
+    # 多层速览在同一流程中绘制为一张图片
+    batch = len(floor_ids) > 1
+    with metrics.timer("command", "quickview_batch" if batch else "quickview"):
+        drawer = (
+            AbyssBatchQuickViewDraw(floor_ids, schedule_key)
+            if batch
+            else AbyssQuickViewDraw(floor_ids[0], chamber_idx, schedule_key)
+        )
+        res = await drawer.get_full_picture()
+        await quickview_matcher.finish(
+            res if isinstance(res, str) else MessageSegment.image(res)
+        )
 
 
 @totalview_matcher.handle()
 async def abyssTotal(arg: Message = CommandArg()):
     if arg:
         await totalview_matcher.finish()
-    akasha_data = await fetch_akasha_abyss()
-    if isinstance(akasha_data, str):
-        await totalview_matcher.finish(akasha_data)
-    drawer = AbyssStatisticDraw(akasha_data)
-    res = await drawer.get_full_picture()
-    await totalview_matcher.finish(MessageSegment.image(res))
+    with metrics.timer("command", "statistic"):
+        akasha_data = await fetch_akasha_abyss()
+        if isinstance(akasha_data, str):
+            await totalview_matcher.finish(akasha_data)
+        drawer = AbyssStatisticDraw(akasha_data)
+        res = await drawer.get_full_picture()
+        await totalview_matcher.finish(
+            res if isinstance(res, str) else MessageSegment.image(res)
+        )
+
+
+@profile_matcher.handle()
+async def abyssProfile(arg: Message = CommandArg()):
+    count, mode = 1, profiler.mode
+    for word in str(arg).split():
+        if word.isdigit():
+            count = int(word)
+        elif word in ("cprofile", "tracemalloc", "both"):
+            mode = word
+        elif word in ("关闭", "off"):
+            count = 0
+        else:
+            await profile_matcher.finish(
+                "用法：深渊分析 [次数] [cprofile|tracemalloc|both]，或 深渊分析 关闭"
+            )
+    profiler.arm(count, mode)  # type: ignore
+    await profile_matcher.finish(
+        f"将记录接下来 {count} 次绘图（{mode}），结果保存至 {PROFILE_DIR.resolve()}"
+        if count
+        else "已关闭绘图性能分析"
+    )
@@ -0,0 +1,296 @@
+import os
+import asyncio
+from hashlib import md5
+from shutil import rmtree
+from threading import Lock
+from tempfile import mkstemp
+from collections import OrderedDict
+from typing import (
+    Any,
+    Set,
+    Dict,
+    Tuple,
+    Generic,
+    TypeVar,
+    Callable,
+    Hashable,
+    Optional,
+    Sequence,
+    Awaitable,
+)
+
+from PIL import Image
+from nonebot.log import logger
+
+from .metrics import metrics
+from .config import plugin_config
+
+T = TypeVar("T")
+
+QUICKVIEW_CACHE_VERSION = "records-2"
+"""深渊速览图缓存版本。缓存键或磁盘缓存文件名格式变化时更新，同时清理旧版本的磁盘缓存"""
+
+
+class LRUCache(Generic[T]):
+    """线程安全的定长 LRU 缓存，附带命中统计"""
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """
+        * ``param maxsize: int = 128`` 最大缓存条目数。为 ``0`` 时不缓存
+        """
+
+        self.maxsize = maxsize
+        self.hits = 0
+        """命中次数"""
+        self.misses = 0
+        """未命中次数"""
+        self._data: "OrderedDict[Hashable, T]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """读取缓存，命中时将条目移至队尾"""
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: T) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+
+        with self._lock:
+            self._data.clear()
+
+    def evict(self, predicate: Callable[[Hashable], bool]) -> int:
+        """移除键满足条件的条目
+
+        * ``param predicate: Callable[[Hashable], bool]`` 判断条件
+        - ``return: int`` 移除的条目数
+        """
+
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计数据"""
+
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class RenderCache:
+    """绘图结果缓存。内存 LRU 缓存编码后的图片，可选磁盘缓存
+
+    缓存以数据版本划分命名空间，数据版本变化时自动清空内存与磁盘缓存。
+    缓存键可附带所用数据记录的摘要作为标签，记录变化时按标签移除内存与磁盘中的相关条目。
+    已移除的标签会被记录，移除后才完成的绘图不再写入缓存
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        disk: bool = False,
+        tags: Callable[[Tuple[Any, ...]], Sequence[str]] = lambda key: (),
+    ) -> None:
+        """
+        * ``param name: str`` 缓存名称。同时作为磁盘缓存目录名
+        * ``param maxsize: int`` 内存缓存最大条目数
+        * ``param disk: bool = False`` 是否启用磁盘缓存
+        * ``param tags: Callable[[Tuple[Any, ...]], Sequence[str]] = lambda key: ()`` 从缓存键中取出标签的函数。标签同时写入磁盘缓存文件名
+        """  # noqa: E501
+
+        self.name = name
+        self.tags = tags
+        self.version = ""
+        """数据版本"""
+        self.memory: LRUCache[bytes] = LRUCache(maxsize)
+        self._stale: Set[str] = set()
+        self._lock = Lock()
+        self.disk_dir = (plugin_config.gsabyss_dir / "render" / name) if disk else None
+        self.disk_hits = 0
+        """磁盘缓存命中次数"""
+
+    def _disk_path(self, key: Tuple[Any, ...]):
+        assert self.disk_dir is not None
+        digest = md5(repr(key).encode("UTF-8")).hexdigest()
+        return self.disk_dir / self.version / "_".join([digest, *self.tags(key)])
+
+    def set_version(self, version: str) -> None:
+        """设置数据版本。与当前版本不同时清空缓存
+
+        * ``param version: str`` 数据版本
+        """
+
+        if version == self.version:
+            return
+        if self.version:
+            logger.info(f"{self.name} 绘图缓存数据版本 {self.version} 已过期")
+        self.version = version
+        self.memory.clear()
+        with self._lock:
+            self._stale.clear()
+        if self.disk_dir and self.disk_dir.exists():
+            # 移除其他版本的磁盘缓存，以及中途退出时残留的临时文件
+            for sub_dir in self.disk_dir.iterdir():
+                if sub_dir.name != version:
+                    rmtree(sub_dir, ignore_errors=True)
+                    continue
+                for tmp_file in sub_dir.glob("*.tmp"):
+                    tmp_file.unlink(missing_ok=True)
+
+    def evict(self, stale: Set[str]) -> int:
+        """移除内存与磁盘中带有过期标签的条目，并记录过期标签
+
+        * ``param stale: Set[str]`` 过期标签
+        - ``return: int`` 移除的内存与磁盘条目总数
+        """
+
+        # 与写入互斥，移除期间完成的绘图不会写入过期条目
+        with self._lock:
+            self._stale |= stale
+            evicted = self.memory.evict(
+                lambda key: not stale.isdisjoint(self.tags(key))  # type: ignore
+            )
+            version_dir = self.disk_dir / self.version if self.disk_dir else None
+            if version_dir and version_dir.exists():
+                # 磁盘缓存文件名形如 ``键摘要_标签_标签``
+                for disk_file in version_dir.iterdir():
+                    if not stale.isdisjoint(disk_file.name.split("_")[1:]):
+                        disk_file.unlink(missing_ok=True)
+                        evicted += 1
+        return evicted
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[bytes]:
+        """读取缓存
+
+        * ``param key: Tuple[Any, ...]`` 缓存键
+        - ``return: Optional[bytes]`` 编码后的图片。未命中时返回空
+        """
+
+        res = self.memory.get(key)
+        if res is None and self.disk_dir:
+            disk_file = self._disk_path(key)
+            if disk_file.exists():
+                res = disk_file.read_bytes()
+                self.memory.set(key, res)
+                self.disk_hits += 1
+        return res
+
+    def set(self, key: Tuple[Any, ...], data: bytes) -> None:
+        """写入缓存。缓存键带有已移除的标签时跳过，即绘图所用数据已在绘制期间更新
+
+        * ``param key: Tuple[Any, ...]`` 缓存键
+        * ``param data: bytes`` 编码后的图片
+        """
+
+        with self._lock:
+            if not self._stale.isdisjoint(self.tags(key)):
+                return
+            self._write(key, data)
+
+    def _write(self, key: Tuple[Any, ...], data: bytes) -> None:
+        self.memory.set(key, data)
+        if self.disk_dir:
+            disk_file = self._disk_path(key)
+            disk_file.parent.mkdir(parents=True, exist_ok=True)
+            # 写入同目录临时文件后替换，中途退出时不会留下不完整的图片
+            fd, tmp_path = mkstemp(suffix=".tmp", dir=disk_file.parent)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, disk_file)
+            except OSError:
+                os.unlink(tmp_path)
+                raise
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计数据"""
+
+        return {
+            **self.memory.stats,
+            "version": self.version,
+            "disk_hits": self.disk_hits,
+        }
+
+
+class SingleFlight:
+    """并发请求合并。相同键的请求在首个请求完成前共享同一结果"""
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self.coalesced = 0
+        """被合并的请求数"""
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """执行请求。已有相同键的请求进行中时等待其结果
+
+        * ``param key: Hashable`` 请求键
+        * ``param func: Callable[[], Awaitable[T]]`` 请求函数
+        - ``return: T`` 请求结果
+        """
+
+        task = self._tasks.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"请求 {key} 已合并至进行中的请求")
+        else:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # 单个请求被取消时不影响其他等待者
+        return await asyncio.shield(task)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """请求合并统计数据"""
+
+        return {"in_flight": len(self._tasks), "coalesced": self.coalesced}
+
+
+render_flight = SingleFlight()
+"""绘图请求合并"""
+metrics.register_cache("render_flight", lambda: render_flight.stats)
+
+quickview_cache = RenderCache(
+    "quickview",
+    plugin_config.gsabyss_render_cache_size,
+    plugin_config.gsabyss_render_cache_disk,
+    # 缓存键自第 5 项起为所用日程、变种记录的摘要
+    lambda key: key[4:],
+)
+"""深渊速览图缓存。以所用深渊解析数据记录的摘要为标签，记录变化时移除相关图像"""
+quickview_cache.set_version(QUICKVIEW_CACHE_VERSION)
+metrics.register_cache("quickview", lambda: quickview_cache.stats)
+
+chamber_tile_cache: LRUCache[Image.Image] = LRUCache(
+    plugin_config.gsabyss_tile_cache_size
+)
+"""深渊速览单间图像缓存。以 ``(层 ID, 变种 ID, 变种记录摘要, 间 ID)`` 为键"""
+metrics.register_cache("chamber_tile", lambda: chamber_tile_cache.stats)
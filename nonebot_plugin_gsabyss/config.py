@@ -1,7 +1,14 @@
 from pathlib import Path
+from typing import Literal
 
 from nonebot import get_driver
-from pydantic import Extra, BaseModel
+from pydantic import Extra, BaseModel, validator
+
+EncodeProfile = Literal["jpeg", "jpeg-hq", "webp", "png", "png8"]
+"""图片编码方案"""
+
+ProfileMode = Literal["cprofile", "tracemalloc", "both"]
+"""绘图性能分析方式"""
 
 
 class Config(BaseModel, extra=Extra.ignore):
@@ -9,6 +16,61 @@ class Config(BaseModel, extra=Extra.ignore):
     """本地缓存目录。默认 `data/gsabyss`"""
     gsabyss_priority: int = 10
     """响应优先级。默认 10"""
+    gsabyss_render_cache_size: int = 64
+    """深渊速览图内存缓存数量。默认 64，为 0 时不缓存"""
+    gsabyss_render_cache_disk: bool = False
+    """是否启用深渊速览图磁盘缓存。默认 `False`"""
+    gsabyss_tile_cache_size: int = 36
+    """深渊速览单间图像内存缓存数量。默认 36"""
+    gsabyss_icon_cache_size: int = 256
+    """已缩放图标内存缓存数量。默认 256"""
+    gsabyss_download_concurrency: int = 16
+    """图片下载全局并发数。默认 16"""
+    gsabyss_download_per_host: int = 6
+    """图片下载单个域名并发数。默认 6"""
+    gsabyss_prefetch_concurrency: int = 4
+    """深渊数据更新后预下载图标的并发数。默认 4"""
+    gsabyss_prerender: bool = True
+    """是否预先绘制本期与下期第 9 至 12 层速览图。默认 `True`"""
+    gsabyss_render_workers: int = 0
+    """绘图进程数。默认 0，即在线程池中绘图"""
+    gsabyss_quickview_format: EncodeProfile = "jpeg"
+    """深渊速览图编码方案。默认 `jpeg`"""
+    gsabyss_statistic_format: EncodeProfile = "png8"
+    """深渊统计图编码方案。默认 `png8`"""
+    gsabyss_metrics: bool = False
+    """是否在 NoneBot 驱动器 HTTP 服务中导出运行指标。默认 `False`"""
+    gsabyss_metrics_port: int = 0
+    """独立导出运行指标的本地端口。默认 0，即不启用"""
+    gsabyss_profile_renders: int = 0
+    """启动后记录性能分析的绘图次数。默认 0"""
+    gsabyss_profile_mode: ProfileMode = "cprofile"
+    """绘图性能分析方式。默认 `cprofile`"""
+    gsabyss_data_url: str = "https://cdn.monsterx.cn/bot/gsabyss/"
+    """HHW 深渊数据与初始化资源下载地址"""
+    gsabyss_akasha_url: str = (
+        "https://akashadata.feixiaoqiu.com/static/data/abyss_total.js"
+    )
+    """Akasha Database 深渊统计数据地址"""
+    gsabyss_akasha_icon_url: str = "https://t.akashadata.com/xstatic/img/c/s/"
+    """Akasha Database 角色图标下载地址"""
+    gsabyss_hhw_mirror: str = "https://genshin.honeyhunterworld.com/img/"
+    """HHW 素材图片下载镜像"""
+    gsabyss_http_max_connections: int = 20
+    """共享 HTTP 客户端最大连接数。默认 20"""
+    gsabyss_http_max_keepalive: int = 10
+    """共享 HTTP 客户端最大保持连接数。默认 10"""
+    gsabyss_http2: bool = False
+    """是否启用 HTTP/2。需要安装 `httpx[http2]`，默认 `False`"""
+    gsabyss_akasha_ttl: int = 1800
+    """深渊统计数据缓存有效期，单位秒。默认 1800"""
+    gsabyss_akasha_full_parse: bool = False
+    """是否完整校验深渊统计数据。默认仅校验深渊统计图所需字段"""
+
+    @validator("gsabyss_data_url", "gsabyss_akasha_icon_url", "gsabyss_hhw_mirror")
+    def _ensure_trailing_slash(cls, v: str) -> str:
+        """下载地址统一以 ``/`` 结尾"""
+        return v if v.endswith("/") else f"{v}/"
 
 
 plugin_config = Config.parse_obj(get_driver().config)
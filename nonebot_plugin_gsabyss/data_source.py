@@ -1,21 +1,41 @@
+import os
 import json
 import asyncio
 from time import time
 from io import BytesIO
+from hashlib import md5
 from pathlib import Path
 from re import sub, findall
+from functools import partial
 from calendar import monthrange
+from urllib.parse import urlsplit
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, Tuple, Union, Literal, Optional
+from typing import (
+    Any,
+    Set,
+    Dict,
+    List,
+    Tuple,
+    Union,
+    Literal,
+    Callable,
+    Optional,
+    Awaitable,
+    AsyncIterator,
+)
 
 from PIL import Image
 from nonebot.log import logger
-from httpx import AsyncClient, stream
+from nonebot.utils import run_sync
+from httpx import Limits, AsyncClient
 from nonebot import require, get_driver
-from pydantic.error_wrappers import ValidationError
 
+from .metrics import metrics
 from .config import plugin_config
-from .models.akasha import AkashaAbyssData
+from .hhw_store import HHWStore, write_store
+from .cache import SingleFlight, quickview_cache, chamber_tile_cache
+from .models.akasha import AkashaAbyssData, AkashaRenderData, select_render_fields
 
 require("nonebot_plugin_apscheduler")
 from nonebot_plugin_apscheduler import scheduler  # noqa: E402
@@ -24,30 +44,300 @@ DL_DIR = plugin_config.gsabyss_dir
 """本地缓存目录。默认 `data/gsabyss`"""
 
 HHW_CACHE = DL_DIR / "abyss_hhw.json"
-"""Honey Hunter World 深渊解析数据文件"""
+"""旧版 Honey Hunter World 深渊解析数据文件。存在时转换为索引存储"""
+
+HHW_STORE = DL_DIR / "abyss_hhw.db"
+"""Honey Hunter World 深渊解析数据索引存储"""
+
+AKASHA_CACHE = DL_DIR / "abyss_akasha.json"
+"""Akasha Database 深渊统计数据快照文件"""
+
+INIT_RES = ["HYWH-85W.ttf", "SmileySans-Oblique.ttf", "star_icon.png", "half_icon.png"]
+"""初始化资源文件列表"""
+
+HHW_IMG_URL = "https://genshin.honeyhunterworld.com/img/"
+"""Honey Hunter World 素材图片地址。深渊解析数据中的图标均以此开头"""
 
 TZ = timezone(timedelta(hours=8))
 """上海时区"""
 
+BATCH_MAX_FLOORS = 4
+"""多层速览最多合并的层数。合并图片高度随层数线性增长"""
+
 driver = get_driver()
 
 
-def download_init_res(file_name: str) -> Path:
+class HHWDataset:
+    """Honey Hunter World 深渊解析数据容器
+
+    深渊解析数据在更新时写入索引存储，读取时仅查询所需记录。
+    存储在单个事务中整体更新，读取方不会读取到写入一半的数据
+    """
+
+    def __init__(self) -> None:
+        self._index: Optional[HHWStore] = None
+        self.version = ""
+        """数据版本。为原始数据摘要"""
+        self._hooks: List[Callable[[], Awaitable[None]]] = []
+        self._hook_tasks: Dict[Callable[[], Awaitable[None]], "asyncio.Task[None]"] = {}
+        self._hook_pending: Set[Callable[[], Awaitable[None]]] = set()
+
+    @property
+    def index(self) -> HHWStore:
+        """深渊解析数据索引存储。尚未加载时从本地数据库加载"""
+
+        if self._index is None:
+            self.load()
+        return self._index  # type: ignore
+
+    def load(self) -> None:
+        """从本地数据库加载深渊解析数据。数据库为空时转换旧版缓存文件"""
+
+        store = HHWStore(HHW_STORE)
+        if not store.ready and HHW_CACHE.exists():
+            logger.info("正在将 HHW 深渊数据缓存文件转换为索引存储")
+            store.close()
+            cache_text = HHW_CACHE.read_text(encoding="UTF-8")
+            self.ingest(json.loads(cache_text), self.digest(cache_text))
+            HHW_CACHE.unlink()
+            return
+        self._activate(store)
+
+    def ingest(
+        self,
+        data: Dict[str, Dict[str, Dict[str, Any]]],
+        version: str,
+        meta: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """写入深渊解析数据并替换索引存储
+
+        * ``param data: Dict[str, Dict[str, Dict[str, Any]]]`` 深渊解析数据
+        * ``param version: str`` 数据版本
+        * ``param meta: Optional[Dict[str, str]] = None`` 一并写入的元数据
+        """
+
+        with metrics.stage("hhw.ingest"):
+            stale = write_store(HHW_STORE, data, version, meta)
+        self._activate(HHWStore(HHW_STORE), stale)
+
+    def _activate(self, store: HHWStore, stale: Optional[Set[str]] = None) -> None:
+        # 单次赋值替换引用，已解析的旧记录随旧的存储引用释放
+        self._index = store
+        self.version = store.version
+        if not stale:
+            return
+        # 仅移除内容变化或已移除的记录对应的图像，包括磁盘缓存
+        evicted = quickview_cache.evict(stale)
+        evicted += chamber_tile_cache.evict(lambda key: key[2] in stale)  # type: ignore
+        logger.info(f"HHW 深渊数据 {len(stale)} 条记录已变化，移除相关绘图缓存 {evicted} 个")
+
+    def on_update(
+        self, func: Callable[[], Awaitable[None]]
+    ) -> Callable[[], Awaitable[None]]:
+        """注册数据加载或更新后在后台执行的任务，可用作装饰器
+
+        * ``param func: Callable[[], Awaitable[None]]`` 后台任务
+        - ``return: Callable[[], Awaitable[None]]`` 原后台任务
+        """
+
+        self._hooks.append(func)
+        return func
+
+    def notify_update(self) -> None:
+        """在后台执行已注册的任务。同一任务仍在进行时，待其完成后再执行一次"""
+
+        for hook in self._hooks:
+            task = self._hook_tasks.get(hook)
+            if task is None or task.done():
+                self._hook_tasks[hook] = asyncio.create_task(self._run_hook(hook))
+            else:
+                self._hook_pending.add(hook)
+
+    async def _run_hook(self, hook: Callable[[], Awaitable[None]]) -> None:
+        # 执行期间数据再次更新时重新执行，多次更新只补执行一次
+        while True:
+            self._hook_pending.discard(hook)
+            try:
+                await hook()
+            except Exception as e:
+                logger.opt(exception=e).error(f"HHW 深渊数据更新后任务 {hook.__name__} 出错")
+            if hook not in self._hook_pending:
+                return
+
+    @staticmethod
+    def digest(text: str) -> str:
+        """计算数据版本"""
+
+        return md5(text.encode("UTF-8")).hexdigest()[:8]
+
+
+hhw_dataset = HHWDataset()
+"""Honey Hunter World 深渊解析数据"""
+metrics.register_cache(
+    "hhw_records",
+    lambda: hhw_dataset._index.records.stats if hhw_dataset._index else {},
+)
+
+
+_client: Optional[AsyncClient] = None
+
+
+def get_client() -> AsyncClient:
+    """获取插件共享的 HTTP 客户端。尚未创建或已关闭时重新创建"""
+
+    global _client
+    if _client is None or _client.is_closed:
+        http2 = plugin_config.gsabyss_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("未安装 h2 依赖，无法启用 HTTP/2：pip install httpx[http2]")
+                http2 = False
+        _client = AsyncClient(
+            verify=False,
+            timeout=20.0,
+            http2=http2,
+            limits=Limits(
+                max_connections=plugin_config.gsabyss_http_max_connections,
+                max_keepalive_connections=plugin_config.gsabyss_http_max_keepalive,
+            ),
+        )
+    return _client
+
+
+@driver.on_startup
+async def init_client() -> None:
+    """启动时创建共享 HTTP 客户端"""
+
+    get_client()
+
+
+@driver.on_shutdown
+async def close_client() -> None:
+    """关闭时释放共享 HTTP 客户端的连接池"""
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """写入临时文件后替换目标文件，避免读取到未写完的文件
+
+    * ``param path: Path`` 目标文件路径
+    * ``param text: str`` 文件内容
+    """
+
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(text, encoding="UTF-8")
+    os.replace(tmp_path, path)
+
+
+async def download_init_res(file_name: str) -> Path:
     """阿里云 OSS 初始化资源下载，不会重复下载已存在的文件"""
 
     save_path = DL_DIR / file_name
     if not save_path.exists():
         logger.info(f"正在下载初始化资源 {file_name}")
-        with stream(
-            "GET", f"https://cdn.monsterx.cn/bot/gsabyss/{file_name}", verify=False
+        tmp_path = save_path.with_name(f"{file_name}.tmp")
+        async with get_client().stream(
+            "GET", f"{plugin_config.gsabyss_data_url}{file_name}"
         ) as r:
-            with open(save_path, "wb") as f:
-                for chunk in r.iter_bytes():
+            r.raise_for_status()
+            with open(tmp_path, "wb") as f:
+                async for chunk in r.aiter_bytes():
                     f.write(chunk)
+        os.replace(tmp_path, save_path)
 
     return save_path
 
 
+async def _prepare_init_res() -> bool:
+    """下载全部初始化资源
+
+    - ``return: bool`` 是否全部就绪
+    """
+
+    results = await asyncio.gather(
+        *[download_init_res(file_name) for file_name in INIT_RES],
+        return_exceptions=True,
+    )
+    ready = True
+    for file_name, res in zip(INIT_RES, results):
+        if isinstance(res, BaseException):
+            logger.opt(exception=res).error(f"初始化资源 {file_name} 下载失败！")
+            ready = False
+    return ready
+
+
+_init_res_task: Optional["asyncio.Task[bool]"] = None
+
+
+async def wait_init_res() -> bool:
+    """等待初始化资源就绪。上次下载失败时重新下载
+
+    - ``return: bool`` 是否全部就绪
+    """
+
+    global _init_res_task
+    if _init_res_task is None or (
+        _init_res_task.done() and not _init_res_task.result()
+    ):
+        _init_res_task = asyncio.create_task(_prepare_init_res())
+    return await asyncio.shield(_init_res_task)
+
+
+@driver.on_startup
+async def prepare_init_res() -> None:
+    """启动时在后台下载初始化资源，不阻塞启动"""
+
+    global _init_res_task
+    if _init_res_task is None:
+        _init_res_task = asyncio.create_task(_prepare_init_res())
+
+
+class DownloadLimiter:
+    """图片下载并发限制。同时限制全局并发数与单个域名的并发数"""
+
+    def __init__(self, total: int, per_host: int) -> None:
+        """
+        * ``param total: int`` 全局最大并发数
+        * ``param per_host: int`` 单个域名最大并发数
+        """
+
+        self.total = total
+        self.per_host = per_host
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """占用一个下载名额，名额不足时等待
+
+        * ``param url: str`` 下载 URL
+        """
+
+        # 信号量需在事件循环内创建
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.total)
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        async with self._global, self._hosts[host]:
+            yield
+
+
+download_limiter = DownloadLimiter(
+    plugin_config.gsabyss_download_concurrency,
+    plugin_config.gsabyss_download_per_host,
+)
+"""图片下载并发限制"""
+
+download_flight = SingleFlight()
+"""图片下载请求合并。以本地文件路径为键"""
+metrics.register_cache("download_flight", lambda: download_flight.stats)
+
+
 async def download_pic(
     url: str, dir: str = "", rename: str = "", retry: int = 3
 ) -> Optional[Path]:
@@ -66,29 +356,50 @@ async def download_pic(
         return f
     f.parent.mkdir(parents=True, exist_ok=True)
 
+    # 相同文件的下载请求共享同一次下载
+    return await download_flight.do(f, partial(_download_pic, url, f, retry))
+
+
+async def _download_pic(url: str, f: Path, retry: int) -> Optional[Path]:
+    """图片资源下载实现，受下载并发限制"""
+
     # 远程文件下载
-    async with AsyncClient(verify=False, timeout=20.0) as client:
-        logger.info(f"正在下载文件 {f.name}\n>>>>> {url}")
-        while retry:
-            try:
-                headers = {
-                    "referer": "https://genshin.honeyhunterworld.com/d_1001/?lang=CHS",
-                    "user-agent": (
-                        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/"
-                        "104.0.5112.81 Safari/537.36 Edg/104.0.1293.47"
-                    ),
-                }
-                res = await client.get(url, headers=headers)
-                userImage = Image.open(BytesIO(res.content)).convert("RGBA")
-                userImage.save(f, format="PNG", quality=100)
-                return f
-            except Exception as e:
-                retry -= 1
-                if retry:
-                    await asyncio.sleep(2)
-                else:
-                    logger.opt(exception=e).error(f"文件 {f.name} 下载失败！")
+    client = get_client()
+    logger.info(f"正在下载文件 {f.name}\n>>>>> {url}")
+    while retry:
+        try:
+            headers = {
+                "referer": "https://genshin.honeyhunterworld.com/d_1001/?lang=CHS",
+                "user-agent": (
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/"
+                    "104.0.5112.81 Safari/537.36 Edg/104.0.1293.47"
+                ),
+            }
+            async with download_limiter.slot(url):
+                with metrics.stage("download"):
+                    res = await client.get(url, headers=headers)
+            userImage = Image.open(BytesIO(res.content)).convert("RGBA")
+            userImage.save(f, format="PNG", quality=100)
+            return f
+        except Exception as e:
+            retry -= 1
+            if retry:
+                await asyncio.sleep(2)
+            else:
+                logger.opt(exception=e).error(f"文件 {f.name} 下载失败！")
+
+
+def hhw_icon_url(url: str) -> str:
+    """Honey Hunter World 素材图片地址替换为镜像地址
+
+    * ``param url: str`` 深渊解析数据中的图标 URL
+    - ``return: str`` 镜像图标 URL
+    """
+
+    if url.startswith(HHW_IMG_URL):
+        return plugin_config.gsabyss_hhw_mirror + url[len(HHW_IMG_URL) :]
+    return url
 
 
 def fix_schedule_key(schedule: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, str]]:
@@ -133,83 +444,208 @@ def fix_schedule_key(schedule: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str,
     timezone="Asia/Shanghai",
 )
 @driver.on_startup
-async def fetch_hhw_abyss(
-    force: bool = False, retry: int = 3
-) -> Optional[Dict[str, Dict[str, Dict[str, Any]]]]:
+async def fetch_hhw_abyss(force: bool = False, retry: int = 3) -> bool:
     """Honey Hunter World 深渊解析数据抓取
 
+    已有数据时发起条件请求，上游返回 304 或内容摘要未变化时跳过解析与写入。
+    数据流式下载至临时文件，解析后增量写入索引存储
+
     * ``param force: bool = False`` 是否强制更新
     * ``param retry: int = 3`` 请求失败重试次数
-    - ``return: Optional[Dict[str, Dict[str, Dict[str, Any]]]]`` JSON 数据。出错时无返回
+    - ``return: bool`` 是否成功加载或更新
     """
 
     # 使用本地缓存
-    if HHW_CACHE.exists() and not force:
-        logger.info("HHW 深渊数据已缓存，跳过更新")
-        return json.loads(HHW_CACHE.read_text(encoding="UTF-8"))
+    if not force:
+        await run_sync(hhw_dataset.load)()
+        if hhw_dataset.version:
+            logger.info("HHW 深渊数据已缓存，跳过更新")
+            hhw_dataset.notify_update()
+            return True
 
     # 使用最新数据
-    async with AsyncClient(verify=False, timeout=20.0) as client:
-        res_json = {}
-        while retry:
-            try:
-                res = await client.get("https://cdn.monsterx.cn/bot/gsabyss/abyss.json")
-                res_json = res.json()
-                break
-            except Exception as e:
-                retry -= 1
-                if retry:
-                    await asyncio.sleep(3)
-                else:
-                    logger.opt(exception=e).error("HHW 深渊数据更新失败！")
-                    return
+    store = await run_sync(lambda: hhw_dataset.index)()
+    headers = {}
+    if store.ready and store.meta.get("etag"):
+        headers["if-none-match"] = store.meta["etag"]
+    if store.ready and store.meta.get("last_modified"):
+        headers["if-modified-since"] = store.meta["last_modified"]
+
+    client = get_client()
+    tmp_path = HHW_STORE.with_name("abyss_hhw.json.tmp")
+    hasher, not_modified, meta = md5(), False, {}
+    while retry:
+        try:
+            hasher = md5()
+            with metrics.stage("hhw.fetch"):
+                async with client.stream(
+                    "GET",
+                    f"{plugin_config.gsabyss_data_url}abyss.json",
+                    headers=headers,
+                ) as res:
+                    not_modified = res.status_code == 304
+                    if not not_modified:
+                        res.raise_for_status()
+                        with open(tmp_path, "wb") as f:
+                            async for chunk in res.aiter_bytes():
+                                hasher.update(chunk)
+                                f.write(chunk)
+                    meta = {
+                        "etag": res.headers.get("etag", ""),
+                        "last_modified": res.headers.get("last-modified", ""),
+                    }
+            break
+        except Exception as e:
+            retry -= 1
+            if retry:
+                await asyncio.sleep(3)
+            else:
+                logger.opt(exception=e).error("HHW 深渊数据更新失败！")
+                tmp_path.unlink(missing_ok=True)
+                return False
+
+    try:
+        version = hasher.hexdigest()[:8]
+        if not_modified or version == store.version:
+            logger.info("HHW 深渊数据未变化，跳过更新")
+            if not not_modified:
+                await run_sync(store.set_meta)(meta)
+        else:
+            with metrics.stage("hhw.parse"):
+                res_json = await run_sync(_read_hhw_json)(tmp_path)
+            # 深境螺旋日程数据的键值需要纠正
+            res_json["Schedule"] = fix_schedule_key(res_json["Schedule"])
+            await run_sync(hhw_dataset.ingest)(res_json, version, meta)
+            logger.info("HHW 深渊数据已更新！")
+    except Exception as e:
+        logger.opt(exception=e).error("HHW 深渊数据解析失败！")
+        return False
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    # 数据未变化时本期与下期也可能已切换，后台任务跳过已完成的部分
+    hhw_dataset.notify_update()
+    return True
+
+
+def _read_hhw_json(path: Path) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """读取下载完成的深渊解析数据"""
 
-    # 深境螺旋日程数据的键值需要纠正
-    res_json["Schedule"] = fix_schedule_key(res_json["Schedule"])
-    # 写入缓存
-    HHW_CACHE.write_text(json.dumps(res_json, ensure_ascii=False), encoding="UTF-8")
-    logger.info("HHW 深渊数据已更新！")
-    return res_json
+    with open(path, "rb") as f:
+        return json.load(f)
 
 
-def get_schedule_key(period: Literal["last", "now", "next"] = "now") -> str:
+def _collect_hhw_icons() -> Dict[Tuple[str, str], str]:
+    """收集本期与下期第 9 至 12 层的间之秘宝、敌人图标。涉及数据库读取，需在线程池中调用
+
+    - ``return: Dict[Tuple[str, str], str]`` 图标目录与名称到下载地址的映射
+    """
+
+    index = hhw_dataset.index
+    targets: Dict[Tuple[str, str], str] = {}
+    for period in ["now", "next"]:
+        schedule = index.schedules.get(get_schedule_key(period))  # type: ignore
+        if not schedule:
+            continue
+        for floor_id in range(9, 13):
+            variant_id = getattr(schedule.arrangement, f"floor_{floor_id}")
+            variant = index.variants.get((floor_id, variant_id))
+            if not variant:
+                continue
+            for chamber in variant.chambers:
+                for reward in chamber.reward:
+                    targets[("reward", reward.name)] = hhw_icon_url(reward.icon)
+                for monster in [
+                    *chamber.monsters.first_half,
+                    *(chamber.monsters.second_half or []),
+                ]:
+                    targets[("monster", monster.name)] = hhw_icon_url(monster.icon)
+    return targets
+
+
+@hhw_dataset.on_update
+async def prefetch_hhw_icons() -> None:
+    """预下载本期与下期第 9 至 12 层的间之秘宝、敌人图标，跳过已下载的图标"""
+
+    targets = await run_sync(_collect_hhw_icons)()
+    missing = {
+        (dir, name): url
+        for (dir, name), url in targets.items()
+        if not (DL_DIR / f"{dir}/{name}.png").exists()
+    }
+    if not missing:
+        logger.debug(f"HHW 深渊图标 {len(targets)} 个均已下载，跳过预下载")
+        return
+
+    total, finished, failed = len(missing), 0, []
+    semaphore = asyncio.Semaphore(plugin_config.gsabyss_prefetch_concurrency)
+    logger.info(f"正在预下载 HHW 深渊图标 {total} 个")
+
+    async def _download(dir: str, name: str, url: str) -> None:
+        nonlocal finished
+        async with semaphore:
+            if not await download_pic(url, dir, name):
+                failed.append(name)
+        finished += 1
+        if finished % 10 == 0 or finished == total:
+            logger.info(f"HHW 深渊图标预下载进度 {finished}/{total}")
+
+    await asyncio.gather(
+        *[_download(dir, name, url) for (dir, name), url in missing.items()]
+    )
+    if failed:
+        logger.warning(f"HHW 深渊图标预下载失败 {len(failed)} 个：{'、'.join(failed)}")
+    else:
+        logger.info("HHW 深渊图标预下载完成！")
+
+
+def get_schedule_key(
+    period: Literal["last", "now", "next"] = "now", at: Optional[datetime] = None
+) -> str:
     """深境螺旋日程数据键值获取
 
     * ``param period: Literal["last", "now", "next"] = "now"`` 周期。支持上期 ``last``、本期 ``now``、下期 ``next``
+    * ``param at: Optional[datetime] = None`` 基准时间。默认为当前时间
     - ``return: str`` 深境螺旋日程数据键值。形如 ``2023-02-01 04:00:00``
     """  # noqa: E501
 
-    # 获取当前周期的起点时间
-    dt = datetime.fromtimestamp(time(), TZ)
-    first_half_start = datetime(dt.year, dt.month, 1, 4, 0, 0, tzinfo=TZ)
-    second_half_start = datetime(dt.year, dt.month, 16, 4, 0, 0, tzinfo=TZ)
-    is_first_half = first_half_start <= dt < second_half_start
-    dt = first_half_start if is_first_half else second_half_start
+    # 获取基准时间所在周期的起点时间。每月 1 日 4 时前仍属上月下半月
+    dt = at.astimezone(TZ) if at else datetime.fromtimestamp(time(), TZ)
+    if dt >= datetime(dt.year, dt.month, 16, 4, 0, 0, tzinfo=TZ):
+        dt = datetime(dt.year, dt.month, 16, 4, 0, 0, tzinfo=TZ)
+    elif dt >= datetime(dt.year, dt.month, 1, 4, 0, 0, tzinfo=TZ):
+        dt = datetime(dt.year, dt.month, 1, 4, 0, 0, tzinfo=TZ)
+    else:
+        _last_month = dt.replace(day=1) - timedelta(days=1)
+        dt = datetime(_last_month.year, _last_month.month, 16, 4, 0, 0, tzinfo=TZ)
 
     # 获取语义对应周期的起点时间
     if period == "last":
-        if is_first_half:
+        if dt.day == 1:
             _last_month = dt - timedelta(days=1)
-            dt = datetime(_last_month.year, _last_month.month, 16, 4, 0, 0, tzinfo=TZ)
+            dt = dt.replace(year=_last_month.year, month=_last_month.month, day=16)
         else:
-            dt -= timedelta(days=15)
+            dt = dt.replace(day=1)
     elif period == "next":
-        _, month_total_day = monthrange(dt.year, dt.month)
-        delta = 15 if is_first_half else (month_total_day - 15)
-        dt += timedelta(days=delta)
+        if dt.day == 1:
+            dt = dt.replace(day=16)
+        else:
+            _next_month = dt + timedelta(days=16)
+            dt = dt.replace(year=_next_month.year, month=_next_month.month, day=1)
 
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def parse_quickview_input(input: str) -> Tuple[int, int, str]:
+def parse_quickview_input(input: str) -> Union[str, Tuple[List[int], int, str]]:
     """用户输入解析，默认结果为本期十二层全层
 
     * ``param input: str`` 用户输入
-    - ``return: Tuple[int, int, str]`` 层数、间数（为 ``0`` 表示获取全层）、深境螺旋日程数据键值
-    """
+    - ``return: Union[str, Tuple[List[int], int, str]]`` 层数列表（多于一层时获取各层全层）、间数（为 ``0`` 表示获取全层）、深境螺旋日程数据键值。输入超出限制时返回提示字符串
+    """  # noqa: E501
 
     # 层数默认 12，间数默认 0，周期默认本期
     floor_idx, chamber_idx, schedule_key = 12, 0, "now"
+    floor_end = 0
 
     chinese_regex = "(十一)|(十二)|一|二|三|四|五|六|七|八|九|十"
     chinese_convert = {
@@ -233,19 +669,26 @@ def parse_quickview_input(input: str) -> Tuple[int, int, str]:
         if keyword.lstrip("第").rstrip("层").isdigit():
             _keyword = keyword.lstrip("第").rstrip("层")
             if 1 <= int(_keyword) <= 12:
-                floor_idx = int(_keyword)
+                floor_idx, floor_end = int(_keyword), 0
                 continue
         # 支持形如："十二"、"第十二层"
         if findall(rf"^第?({chinese_regex})层?$", keyword):
             first_matched = findall(rf"第?({chinese_regex})层?", keyword)[0]
-            floor_idx = chinese_convert[first_matched[0]]
+            floor_idx, floor_end = chinese_convert[first_matched[0]], 0
             continue
         # 支持形如："12-3"、"1-1"、"12_1"、"12—1"、"12－1"
         if sub(r"[-_—－]", "", keyword).isdigit():
             matched = findall(r"^(1[0-2]|[1-9])[-_—－]([1-3])$", keyword)
             if matched:
                 floor_idx, chamber_idx = int(matched[0][0]), int(matched[0][1])
+                floor_end = 0
                 continue
+        # 支持形如："9-12"、"9_12"、"9~12"、"9至12层"，间数不超过 3 时视为指定间
+        matched = findall(r"^第?(1[0-2]|[1-9])层?[-_—－~～至到]第?(1[0-2]|[1-9])层?$", keyword)
+        if matched and matched[0][0] != matched[0][1]:
+            floor_idx, floor_end = sorted(int(_f) for _f in matched[0])
+            chamber_idx = 0
+            continue
         # 支持形如："上期"、"下期"
         if keyword in ["上期", "下期"]:
             schedule_key = "last" if keyword == "上期" else "next"
@@ -279,35 +722,186 @@ def parse_quickview_input(input: str) -> Tuple[int, int, str]:
     if schedule_key in ["last", "now", "next"]:
         schedule_key = get_schedule_key(schedule_key)  # type: ignore
 
-    return floor_idx, chamber_idx, schedule_key
+    floor_ids = list(range(floor_idx, floor_end + 1)) if floor_end else [floor_idx]
+    if len(floor_ids) > BATCH_MAX_FLOORS:
+        return f"一次最多查询连续 {BATCH_MAX_FLOORS} 层的深渊速览哦！如：9-12"
+    return floor_ids, chamber_idx, schedule_key
 
 
-async def fetch_akasha_abyss(retry: int = 3) -> Union[AkashaAbyssData, str]:
-    """Akasha Database 深渊统计数据抓取
+def parse_akasha(obj: Dict[str, Any]) -> AkashaRenderData:
+    """解析 Akasha Database 深渊统计数据。默认仅选取并校验深渊统计图所需字段
 
-    * ``param retry: int = 3`` 请求失败重试次数
-    - ``return: Union[AkashaAbyssData, str]`` AkashaAbyssData 数据。出错时返回错误消息
+    * ``param obj: Dict[str, Any]`` 深渊统计原始数据
+    - ``return: AkashaRenderData`` 深渊统计数据。完整解析时为 ``AkashaAbyssData``
     """
 
-    error_msg = ""
+    if plugin_config.gsabyss_akasha_full_parse:
+        return AkashaAbyssData.parse_obj(obj)
+    return AkashaRenderData.parse_obj(select_render_fields(obj))
 
-    # 使用最新数据
-    async with AsyncClient(verify=False, timeout=20.0) as client:
+
+class AkashaCache:
+    """Akasha Database 深渊统计数据缓存
+
+    缓存有效期内直接使用缓存；过期后先返回旧数据，同时在后台重新验证。
+    上游支持时使用 ``ETag`` / ``Last-Modified`` 条件请求，上游出错时使用本地快照
+    """
+
+    def __init__(self) -> None:
+        self.data: Optional[AkashaRenderData] = None
+        """深渊统计数据。默认仅包含深渊统计图所需字段"""
+        self.fetched_at = 0.0
+        """最近一次确认数据有效的时间戳"""
+        self.etag = ""
+        self.last_modified = ""
+        self._task: Optional["asyncio.Task[Union[AkashaRenderData, str]]"] = None
+        self._snapshot_task: Optional["asyncio.Task[None]"] = None
+        self.hits = 0
+        """缓存有效期内命中次数"""
+        self.stale_hits = 0
+        """缓存过期后返回旧数据次数"""
+        self.misses = 0
+        """无可用数据次数"""
+        self.not_modified = 0
+        """重新验证时上游数据未变化次数"""
+
+    @property
+    def fresh(self) -> bool:
+        """缓存是否在有效期内"""
+
+        return time() - self.fetched_at < plugin_config.gsabyss_akasha_ttl
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计数据"""
+
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "age_seconds": time() - self.fetched_at if self.data else -1,
+        }
+
+    async def load_snapshot(self) -> None:
+        """加载本地快照。仅在首次使用时于线程池中加载，并发调用时等待同一次加载"""
+
+        if self._snapshot_task is None:
+            self._snapshot_task = asyncio.create_task(run_sync(self._read_snapshot)())
+        await asyncio.shield(self._snapshot_task)
+
+    def _read_snapshot(self) -> None:
+        """读取并解析本地快照。涉及磁盘读取与数据校验，需在线程池中调用"""
+
+        if not AKASHA_CACHE.exists():
+            return
+        try:
+            snapshot = json.loads(AKASHA_CACHE.read_text(encoding="UTF-8"))
+            self.data = parse_akasha(snapshot["data"])
+            self.etag = snapshot.get("etag", "")
+            self.last_modified = snapshot.get("last_modified", "")
+            self.fetched_at = snapshot.get("fetched_at", 0.0)
+        except Exception as e:
+            logger.opt(exception=e).warning("Akasha 深渊数据本地快照读取失败")
+
+    def save_snapshot(self, res_json: Dict[str, Any]) -> None:
+        """保存本地快照
+
+        * ``param res_json: Dict[str, Any]`` 深渊统计原始数据
+        """
+
+        snapshot = {
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched_at": self.fetched_at,
+            "data": res_json,
+        }
+        atomic_write_text(AKASHA_CACHE, json.dumps(snapshot, ensure_ascii=False))
+
+    def revalidate(
+        self, retry: int = 3
+    ) -> "asyncio.Task[Union[AkashaRenderData, str]]":
+        """发起重新验证。已有进行中的请求时复用该请求
+
+        * ``param retry: int = 3`` 请求失败重试次数
+        - ``return: asyncio.Task[Union[AkashaRenderData, str]]`` 重新验证任务
+        """
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._request(retry))
+        return self._task
+
+    async def _request(self, retry: int) -> Union[AkashaRenderData, str]:
+        """请求上游数据。出错时返回旧数据或错误消息"""
+
+        error_msg = ""
+        headers = {}
+        if self.data and self.etag:
+            headers["if-none-match"] = self.etag
+        if self.data and self.last_modified:
+            headers["if-modified-since"] = self.last_modified
+
+        client = get_client()
         while retry:
             try:
-                res = await client.get(
-                    "https://akashadata.feixiaoqiu.com/static/data/abyss_total.js",
-                    params={"v": str(time())[:7]},
-                )
-                res_json = json.loads(res.text.lstrip("var static_abyss_total ="))
-                return AkashaAbyssData.parse_obj(res_json)
+                with metrics.stage("akasha.fetch"):
+                    res = await client.get(
+                        plugin_config.gsabyss_akasha_url,
+                        params={"v": str(time())[:7]},
+                        headers=headers,
+                    )
+                if res.status_code == 304 and self.data:
+                    logger.debug("Akasha 深渊数据未变化")
+                    self.not_modified += 1
+                    self.fetched_at = time()
+                    return self.data
+                res.raise_for_status()
+                with metrics.stage("akasha.parse"):
+                    res_json = json.loads(res.text.lstrip("var static_abyss_total ="))
+                    self.data = parse_akasha(res_json)
+                self.etag = res.headers.get("etag", "")
+                self.last_modified = res.headers.get("last-modified", "")
+                self.fetched_at = time()
+                await run_sync(self.save_snapshot)(res_json)
+                return self.data
             except Exception as e:
                 retry -= 1
                 if retry:
                     await asyncio.sleep(3)
                 else:
-                    act = "获取" if isinstance(Exception, ValidationError) else "解析"
+                    act = "解析" if isinstance(e, ValueError) else "获取"
                     error_msg = f"Akasha 深渊数据{act}失败！"
                     logger.opt(exception=e).error(error_msg)
 
-    return error_msg
+        # 上游出错时使用旧数据
+        return self.data or error_msg
+
+
+akasha_cache = AkashaCache()
+"""Akasha Database 深渊统计数据缓存"""
+metrics.register_cache("akasha", lambda: akasha_cache.stats)
+
+
+async def fetch_akasha_abyss(retry: int = 3) -> Union[AkashaRenderData, str]:
+    """Akasha Database 深渊统计数据抓取
+
+    * ``param retry: int = 3`` 请求失败重试次数
+    - ``return: Union[AkashaRenderData, str]`` 深渊统计数据。出错时返回错误消息
+    """
+
+    await akasha_cache.load_snapshot()
+
+    # 使用缓存数据
+    if akasha_cache.data and akasha_cache.fresh:
+        akasha_cache.hits += 1
+        return akasha_cache.data
+
+    # 缓存过期时先返回旧数据，后台重新验证
+    task = akasha_cache.revalidate(retry)
+    if akasha_cache.data:
+        akasha_cache.stale_hits += 1
+        return akasha_cache.data
+
+    # 无任何可用数据时等待请求完成
+    akasha_cache.misses += 1
+    return await asyncio.shield(task)
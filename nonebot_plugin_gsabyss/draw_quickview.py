@@ -1,14 +1,20 @@
-import json
 import asyncio
 from math import ceil
 from io import BytesIO
 from datetime import datetime
-from typing import List, Union, Optional
+from functools import partial
+from typing import Any, Dict, List, Tuple, Union, Optional
 
 from PIL import Image, ImageDraw
 from nonebot.utils import run_sync
 
-from .data_source import DL_DIR, HHW_CACHE, download_pic
+from .metrics import metrics
+from .profiler import profiler
+from .hhw_store import HHWStore
+from .config import plugin_config
+from .render_pool import render_pool
+from .cache import render_flight, quickview_cache, chamber_tile_cache
+from .data_source import hhw_dataset, download_pic, hhw_icon_url, wait_init_res
 from .models.hhw import (
     Blessing,
     Monsters,
@@ -28,21 +34,18 @@ from .draw_utils import (
     BG_DEEP,
     BG_COLOR,
     BG_LIGHT,
-    RESAMPLE,
     RARITY_BG,
-    _f16,
-    _f24,
-    _gsf16,
-    _gsf20,
-    _gsf32,
-    _gsf64,
-    _half_img,
-    _star_img,
-    _coord_calc,
-    _f24_char_height,
-    _gsf16_char_height,
-    _gsf20_char_height,
-    _gsf32_char_height,
+    SMILEY_FONT,
+    TextSegment,
+    font,
+    half_img,
+    star_img,
+    load_icon,
+    char_height,
+    layout_text,
+    encode_image,
+    draw_segments,
+    filled_rectangle,
 )
 
 
@@ -61,21 +64,37 @@ class AbyssQuickViewDraw:
         self.chamber_id = chamber_id
         self.chamber_key = str(chamber_id)
         self.schedule_key = schedule_key
-        self.DATA = json.loads(HHW_CACHE.read_text(encoding="UTF-8"))
-        """Honey Hunter World 深渊解析数据"""
+        self._index: Optional[HHWStore] = None
         self.picture_mode = "vertical" if chamber_id else "horizontal"
         """深渊速览图片模式。单间为竖直排版，全层为水平排版"""
+        self.complete = True
+        """图片素材是否完整。不完整时绘制结果不缓存"""
 
     @property
-    def variant_key(self) -> Optional[str]:
-        """深境螺旋层变种键名"""
+    def INDEX(self) -> HHWStore:
+        """Honey Hunter World 深渊解析数据索引。首次读取时固定，同一次绘制中不随数据更新变化"""
+
+        if self._index is None:
+            self._index = hhw_dataset.index
+        return self._index
+
+    @property
+    def variant_id(self) -> Optional[int]:
+        """深境螺旋层变种 ID"""
+
+        return self.variant_of(self.INDEX.schedules.get(self.schedule_key))
+
+    def variant_of(self, schedule_data: Optional[ScheduleItemModel]) -> Optional[int]:
+        """根据日程数据获取深境螺旋层变种 ID
+
+        * ``param schedule_data: Optional[ScheduleItemModel]`` 深境螺旋日程数据
+        - ``return Optional[int]`` 深境螺旋层变种 ID。未找到日程数据时为空
+        """
 
         if self.floor_id <= 8:
-            return list(self.DATA["Floor"][self.floor_key].keys())[0]
-        elif self.DATA["Schedule"].get(self.schedule_key):
-            return self.DATA["Schedule"][self.schedule_key]["arrangement"][
-                self.floor_key
-            ]
+            return self.INDEX.default_variants.get(self.floor_id)
+        elif schedule_data:
+            return getattr(schedule_data.arrangement, f"floor_{self.floor_id}")
         else:
             return
 
@@ -85,7 +104,19 @@ class AbyssQuickViewDraw:
         dt = datetime.strptime(self.schedule_key, "%Y-%m-%d %H:%M:%S")
         return f"{dt.year}年{dt.month}月上" if dt.day < 16 else f"{dt.year}年{dt.month}月下"
 
-    @run_sync
+    @property
+    def cache_key(self) -> Tuple[str, int, int, str, str, str]:
+        """深渊速览图缓存键。编码方案或所用日程、变种记录变化时不使用旧的缓存"""
+
+        return (
+            self.schedule_key,
+            self.floor_id,
+            self.chamber_id,
+            plugin_config.gsabyss_quickview_format,
+            self.INDEX.schedules.digest(self.schedule_key),
+            self.INDEX.variants.digest((self.floor_id, self.variant_id or 0)),
+        )
+
     def draw_header_blessing_para(self, blessing: Blessing) -> Image.Image:
         """绘制头部渊月祝福段落。宽度 530，高度自适应
 
@@ -96,19 +127,17 @@ class AbyssQuickViewDraw:
         result = Image.new("RGBA", (530, 200), BG_DEEP)
         drawer = ImageDraw.Draw(result)
 
-        _width, height_acul = 0, 0
-        for text_with_color in blessing.split_colorful_detail:
-            color = text_with_color.color or WHITE
-            for s in text_with_color.text:
-                _x, height_acul, _width = _coord_calc(
-                    s, _width, height_acul, result.width
-                )
-                drawer.text((_x, height_acul), s, fill=color, font=_gsf20)
-        height_acul += _gsf20_char_height
+        segments, _, height_acul = layout_text(
+            [(t.text, t.color or WHITE) for t in blessing.split_colorful_detail],
+            0,
+            0,
+            result.width,
+        )
+        draw_segments(drawer, segments)
+        height_acul += char_height(20)
 
         return result.crop((0, 0, 530, height_acul))
 
-    @run_sync
     def draw_header_disorder_para(self, disorders: List[str]) -> Image.Image:
         """绘制头部地脉异常段落。宽度 530，高度自适应
 
@@ -116,42 +145,40 @@ class AbyssQuickViewDraw:
         - ``return Image.Image`` 地脉异常段落图像
         """
 
-        result = Image.new("RGBA", (530, 300), BG_DEEP)
-        drawer = ImageDraw.Draw(result)
-
-        _width, height_acul = 0, 0
+        # 先排版再按实际高度绘制，多层速览合并各层地脉异常时可能较长
+        all_segments: List[TextSegment] = []
+        height_acul = 0
         for text in disorders:
-            for s in text:
-                x_s, height_acul, _width = _coord_calc(
-                    s, _width, height_acul, result.width
-                )
-                drawer.text((x_s, height_acul), s, fill=WHITE, font=_gsf20)
-            # 一条地脉异常绘制完毕，换行并从行首开始绘制
-            _width = 0
-            height_acul += _gsf20_char_height + 10
+            segments, _, height_acul = layout_text([(text, WHITE)], 0, height_acul, 530)
+            all_segments.extend(segments)
+            # 一条地脉异常排版完毕，换行并从行首开始排版
+            height_acul += char_height(20) + 10
         height_acul -= 10
 
-        return result.crop((0, 0, 530, height_acul))
+        result = Image.new("RGBA", (530, max(height_acul, 0)), BG_DEEP)
+        draw_segments(ImageDraw.Draw(result), all_segments)
+        return result
 
-    async def draw_header(
+    @metrics.timed("quickview.draw_header")
+    def draw_header(
         self,
         blessing: Blessing,
         disorders: List[str],
+        floor_title: str = "",
     ) -> Image.Image:
         """绘制头部
 
         * ``param blessing: Blessing`` 深境螺旋日程数据 渊月祝福
         * ``param disorders: List[str]`` 深境螺旋单层变种数据 地脉异常
+        * ``param floor_title: str = ""`` 标题中的层数。默认为本层
         - ``return Image.Image`` 头部图像
         """
 
-        title = f"{self.schedule_title}   深渊速览 {self.floor_id} 层"
-        imgs: List[Image.Image] = await asyncio.gather(
-            *[
-                self.draw_header_blessing_para(blessing),
-                self.draw_header_disorder_para(disorders),
-            ]
-        )
+        title = f"{self.schedule_title}   深渊速览 {floor_title or self.floor_id} 层"
+        imgs = [
+            self.draw_header_blessing_para(blessing),
+            self.draw_header_disorder_para(disorders),
+        ]
 
         # 绘制基准坐标计算
         if self.picture_mode == "horizontal":
@@ -159,51 +186,57 @@ class AbyssQuickViewDraw:
             width = 700 * 3
             height = 40 + max(
                 [
-                    _gsf32_char_height,
-                    _f24_char_height * 2 + 10,
+                    char_height(32),
+                    char_height(24, SMILEY_FONT) * 2 + 10,
                     imgs[0].height,
                     imgs[1].height,
                 ]
             )
             pos = {
                 "title": (
-                    int((700 - _gsf32.getlength(title)) / 2),
-                    int((height - _gsf32_char_height) / 2),
+                    int((700 - font(32).getlength(title)) / 2),
+                    int((height - char_height(32)) / 2),
+                ),
+                "bls_title": (
+                    700 + 30,
+                    int((height - char_height(24, SMILEY_FONT) * 2 - 10) / 2),
                 ),
-                "bls_title": (700 + 30, int((height - _f24_char_height * 2 - 10) / 2)),
                 "bls_para": (700 + 140, int((height - imgs[0].height) / 2)),
-                "dsd_title": (700 * 2 + 30, int((height - _f24_char_height) / 2)),
+                "dsd_title": (
+                    700 * 2 + 30,
+                    int((height - char_height(24, SMILEY_FONT)) / 2),
+                ),
                 "dsd_para": (700 * 2 + 140, int((height - imgs[1].height) / 2)),
             }
         else:
             # 竖直排版
-            bls_perch = max(_f24_char_height * 2 + 10, imgs[0].height)
-            dsd_perch = max(_f24_char_height, imgs[1].height)
+            bls_perch = max(char_height(24, SMILEY_FONT) * 2 + 10, imgs[0].height)
+            dsd_perch = max(char_height(24, SMILEY_FONT), imgs[1].height)
             width = 700
-            height = sum([20, _gsf32_char_height, 20, bls_perch, 20, dsd_perch, 20])
+            height = sum([20, char_height(32), 20, bls_perch, 20, dsd_perch, 20])
             pos = {
-                "title": (int((700 - _gsf32.getlength(title)) / 2), 20),
+                "title": (int((700 - font(32).getlength(title)) / 2), 20),
                 "bls_title": (
                     30,
                     40
-                    + _gsf32_char_height
-                    + int((bls_perch - _f24_char_height * 2 - 10) / 2),
+                    + char_height(32)
+                    + int((bls_perch - char_height(24, SMILEY_FONT) * 2 - 10) / 2),
                 ),
                 "bls_para": (
                     140,
-                    40 + _gsf32_char_height + int((bls_perch - imgs[0].height) / 2),
+                    40 + char_height(32) + int((bls_perch - imgs[0].height) / 2),
                 ),
                 "dsd_title": (
                     30,
                     60
-                    + _gsf32_char_height
+                    + char_height(32)
                     + bls_perch
-                    + int((dsd_perch - _f24_char_height) / 2),
+                    + int((dsd_perch - char_height(24, SMILEY_FONT)) / 2),
                 ),
                 "dsd_para": (
                     140,
                     60
-                    + _gsf32_char_height
+                    + char_height(32)
                     + bls_perch
                     + int((dsd_perch - imgs[1].height) / 2),
                 ),
@@ -214,14 +247,17 @@ class AbyssQuickViewDraw:
         drawer = ImageDraw.Draw(result)
 
         # 第一部分：标题
-        drawer.text(pos["title"], title, fill=YELLOW, font=_gsf32)
+        drawer.text(pos["title"], title, fill=YELLOW, font=font(32))
         # 第二部分：渊月祝福
-        drawer.text(pos["bls_title"], "渊月祝福", fill=YELLOW, font=_f24)
+        drawer.text(pos["bls_title"], "渊月祝福", fill=YELLOW, font=font(24, SMILEY_FONT))
         drawer.text(
-            (pos["bls_title"][0], int(pos["bls_title"][1] + _f24_char_height + 10)),
+            (
+                pos["bls_title"][0],
+                int(pos["bls_title"][1] + char_height(24, SMILEY_FONT) + 10),
+            ),
             blessing.name,
             fill=YELLOW,
-            font=_f24,
+            font=font(24, SMILEY_FONT),
         )
         result.paste(imgs[0], pos["bls_para"], imgs[0])
         # 竖直排版时第二部分与第三部分之间绘制直线分割
@@ -232,12 +268,12 @@ class AbyssQuickViewDraw:
                 width=1,
             )
         # 第三部分：地脉异常
-        drawer.text(pos["dsd_title"], "地脉异常", fill=YELLOW, font=_f24)
+        drawer.text(pos["dsd_title"], "地脉异常", fill=YELLOW, font=font(24, SMILEY_FONT))
         result.paste(imgs[1], pos["dsd_para"], imgs[1])
 
         return result
 
-    @run_sync
+    @metrics.timed("quickview.draw_chamber_top")
     def draw_chamber_top(
         self,
         conditions: List[str],
@@ -259,24 +295,24 @@ class AbyssQuickViewDraw:
         this_chamber_id = chamber_id_ if chamber_id_ is not None else self.chamber_id
         chamber_title = f"{self.floor_id}-{this_chamber_id}"
         drawer.text(
-            (700 - _gsf64.getlength(chamber_title) - 30, 10),
+            (700 - font(64).getlength(chamber_title) - 30, 10),
             chamber_title,
             fill=BLACK,
-            font=_gsf64,
+            font=font(64),
         )
         # 挑战目标
-        drawer.text((25, 25), "挑战目标", fill=YELLOW, font=_f24)
+        drawer.text((25, 25), "挑战目标", fill=YELLOW, font=font(24, SMILEY_FONT))
         drawer.rectangle((30, 65, 350 - 1, 165 - 1), fill=BG_LIGHT, width=0)
         for c_idx, cond in enumerate(conditions):
-            result.paste(_star_img, (43, 73 + c_idx * 30), _star_img)
+            result.paste(star_img(), (43, 73 + c_idx * 30), star_img())
             drawer.text(
-                (80, int(73 + c_idx * 30 + 24 / 2 - _gsf20.getbbox(cond)[-1] / 2)),
+                (80, int(73 + c_idx * 30 + 24 / 2 - font(20).getbbox(cond)[-1] / 2)),
                 cond,
                 fill=WHITE,
-                font=_gsf20,
+                font=font(20),
             )
         # 间之秘宝
-        drawer.text((365, 55), "间之秘宝", fill=YELLOW, font=_f24)
+        drawer.text((365, 55), "间之秘宝", fill=YELLOW, font=font(24, SMILEY_FONT))
         for r_idx, reward in enumerate(rewards):
             # 稀有度背景
             drawer.rectangle(
@@ -285,16 +321,9 @@ class AbyssQuickViewDraw:
                 width=0,
             )
             # 秘宝图标
-            icon_path = DL_DIR / f"reward/{reward.name}.png"
-            if icon_path.exists():
-                icon_img = Image.open(icon_path).convert("RGBA")
-                # HHW 物品图标可能非正方形，使较长边的长度缩放至 50px
-                icon_img = icon_img.resize(
-                    (50, int(icon_img.height * 50 / icon_img.width))
-                    if icon_img.width >= icon_img.height
-                    else (int(icon_img.width * 50 / icon_img.height), 50),
-                    resample=RESAMPLE,
-                )
+            # HHW 物品图标可能非正方形，使较长边的长度缩放至 50px
+            icon_img = load_icon("reward", reward.name, 50)
+            if icon_img:
                 result.paste(
                     icon_img,
                     (
@@ -304,23 +333,28 @@ class AbyssQuickViewDraw:
                     icon_img,
                 )
             # 数量背景
-            cnt_bg = Image.new("RGBA", (60, 20), BG_CNT)
+            cnt_bg = filled_rectangle(60, 20, BG_CNT)
             result.paste(cnt_bg, (370 + r_idx * 60, 145), cnt_bg)
             # 数量
             cnt_str = str(reward.count)
             drawer.text(
                 (
-                    int(370 + r_idx * 60 + 60 / 2 - _f16.getlength(cnt_str) / 2),
-                    int(145 + 20 - _f16.getbbox(cnt_str)[-1] - 2),
+                    int(
+                        370
+                        + r_idx * 60
+                        + 60 / 2
+                        - font(16, SMILEY_FONT).getlength(cnt_str) / 2
+                    ),
+                    int(145 + 20 - font(16, SMILEY_FONT).getbbox(cnt_str)[-1] - 2),
                 ),
                 cnt_str,
                 fill=WHITE,
-                font=_f16,
+                font=font(16, SMILEY_FONT),
             )
 
         return result
 
-    @run_sync
+    @metrics.timed("quickview.draw_chamber_middle")
     def draw_chamber_middle(
         self, monster_lvl_overwrite: int, monsters: Monsters
     ) -> Image.Image:
@@ -331,20 +365,21 @@ class AbyssQuickViewDraw:
         - ``return Image.Image`` 单间中间图像
         """
 
+        # 仅渊月螺旋含有下半讨伐列表
+        halves = [_h for _h in [monsters.first_half, monsters.second_half] if _h]
         # 预计算讨伐列表区域高度
-        height = sum(
-            (30 + ceil(len(monsters.dict()[_k]) / 2) * 50)
-            for _k in monsters.dict().keys()
-            if monsters.dict()[_k]
-        )
+        height = sum((30 + ceil(len(_h) / 2) * 50) for _h in halves)
 
         result = Image.new("RGBA", (700, 65 + height - 20), BG_COLOR)
         drawer = ImageDraw.Draw(result)
 
         # 标题
-        drawer.text((25, 25), "讨伐列表", fill=YELLOW, font=_f24)
+        drawer.text((25, 25), "讨伐列表", fill=YELLOW, font=font(24, SMILEY_FONT))
         drawer.text(
-            (115, 25 + 8), f"敌人等级 Lv.{monster_lvl_overwrite}", fill=BROWN, font=_f16
+            (115, 25 + 8),
+            f"敌人等级 Lv.{monster_lvl_overwrite}",
+            fill=BROWN,
+            font=font(16, SMILEY_FONT),
         )
         # 讨伐列表
         y_add = 0
@@ -362,12 +397,9 @@ class AbyssQuickViewDraw:
                 width=0,
             )
             # 半间图标
-            if len([_k for _k in monsters.dict().keys() if monsters.dict()[_k]]) == 2:
-                if half_idx == 0:
-                    half_icon = _half_img
-                else:
-                    # 下半间的图标由原图标上下翻转生成
-                    half_icon = _half_img.transpose(Image.FLIP_TOP_BOTTOM)
+            if len(halves) == 2:
+                # 下半间的图标由原图标上下翻转生成
+                half_icon = half_img(flip=half_idx != 0)
                 result.paste(half_icon, (670 - 12, 65 + y_add - 12), half_icon)
             # 敌人
             for m_idx, monster in enumerate(monsters_half):
@@ -381,26 +413,24 @@ class AbyssQuickViewDraw:
                     fill=rarity_bg,
                     width=0,
                 )
-                icon_path = DL_DIR / f"monster/{monster.name}.png"
-                if icon_path.exists():
-                    icon_img = Image.open(icon_path).convert("RGBA")
-                    icon_img = icon_img.resize((38, 38), resample=RESAMPLE)
+                icon_img = load_icon("monster", monster.name, 38)
+                if icon_img:
                     result.paste(icon_img, (icon_x + 1, icon_y + 1), icon_img)
                 drawer.text(
                     (
                         icon_x + 55,
-                        int(icon_y + 40 / 2 - _gsf20.getbbox(monster.name)[-1] / 2),
+                        int(icon_y + 40 / 2 - font(20).getbbox(monster.name)[-1] / 2),
                     ),
                     monster.name,
                     fill=YELLOW,
-                    font=_gsf20,
+                    font=font(20),
                 )
             # 半间讨伐列表绘制完毕
             y_add += _bg_height + 20
 
         return result
 
-    @run_sync
+    @metrics.timed("quickview.draw_chamber_buttom")
     def draw_chamber_buttom(
         self, possible_buff: List[List[PossibleBuffItem]]
     ) -> Image.Image:
@@ -417,25 +447,27 @@ class AbyssQuickViewDraw:
         drawer = ImageDraw.Draw(result)
 
         # 标题
-        drawer.text((25, 25), "深秘降福", fill=YELLOW, font=_f24)
+        drawer.text((25, 25), "深秘降福", fill=YELLOW, font=font(24, SMILEY_FONT))
         drawer.rectangle((30, 65, 670 - 1, 65 + height_est - 1), fill=BG_LIGHT, width=0)
         # 深秘降福
         _max_width = 95 + 550
         height_acul = 65 + 20
         for b_idx, buffs in enumerate(possible_buff):
             drawer.text(
-                (50, height_acul - 2), f"#{b_idx + 1}", fill=ORANGE, font=_gsf20
+                (50, height_acul - 2), f"#{b_idx + 1}", fill=ORANGE, font=font(20)
             )
             for buff in buffs:
                 text = f"{buff.buff}{buff.time}"
-                _width = 95
-                for s_idx, s in enumerate(text):
-                    color = WHITE if s_idx < len(text) - 4 else BROWN
-                    _x, height_acul, _width = _coord_calc(
-                        s, _width, height_acul, _max_width, 95, 16
-                    )
-                    drawer.text((_x, height_acul), s, fill=color, font=_gsf16)
-                height_acul += _gsf16_char_height + 10
+                segments, _, height_acul = layout_text(
+                    [(text[:-4], WHITE), (text[-4:], BROWN)],
+                    95,
+                    height_acul,
+                    _max_width,
+                    95,
+                    16,
+                )
+                draw_segments(drawer, segments, 16)
+                height_acul += char_height(16) + 10
             height_acul += 10
 
         # 根据实际绘制占用高度填补背景色
@@ -444,37 +476,31 @@ class AbyssQuickViewDraw:
         )
         return result.crop((0, 0, 700, height_acul + 20))
 
-    async def draw_chamber(
+    @metrics.timed("quickview.draw_chamber")
+    def draw_chamber(
         self, chamber_data: ChamberModel, chamber_id_: Optional[int] = None
     ) -> Image.Image:
         """绘制单间
 
         * ``param chamber_data: ChamberModel`` 深境螺旋单间数据
         * ``param chamber_id_: Optional[int] = None`` 深境螺旋间 ID。获取全层时每间需要分别传入
-        - ``return Image.Image`` 单间图像
+        - ``return Image.Image`` 单间图像。为缓存共享，不可修改
         """
 
-        # 下载图片素材。包括间之秘宝、敌人
-        dl_tasks = [
-            download_pic(reward.icon, "reward", reward.name)
-            for reward in chamber_data.reward
-        ]
-        for monsters_half in [
-            chamber_data.monsters.first_half,
-            chamber_data.monsters.second_half,
-        ]:
-            if monsters_half:
-                dl_tasks.extend(
-                    [
-                        download_pic(monster.icon, "monster", monster.name)
-                        for monster in monsters_half
-                    ]
-                )
-        await asyncio.gather(*dl_tasks)
-        dl_tasks.clear()
+        # 使用已绘制的单间图像。单间图像与日程、排版无关，单间与全层共用
+        this_chamber_id = chamber_id_ if chamber_id_ is not None else self.chamber_id
+        tile_key = (
+            self.floor_id,
+            self.variant_id,
+            self.INDEX.variants.digest((self.floor_id, self.variant_id or 0)),
+            this_chamber_id,
+        )
+        tile = chamber_tile_cache.get(tile_key)
+        if tile is not None:
+            return tile
 
         # 获取单间图片各部分
-        tasks = [
+        imgs = [
             self.draw_chamber_top(
                 chamber_data.conditions, chamber_data.reward, chamber_id_
             ),
@@ -483,7 +509,6 @@ class AbyssQuickViewDraw:
             ),
             self.draw_chamber_buttom(chamber_data.possible_buff),
         ]
-        imgs: List[Image.Image] = await asyncio.gather(*tasks)
         # 合并各部分
         chamber = Image.new("RGBA", (700, sum(img.height for img in imgs)))
         paste_height = 0
@@ -491,67 +516,429 @@ class AbyssQuickViewDraw:
             chamber.paste(img, (0, paste_height), img)
             paste_height += img.height
 
+        # 图片素材不完整时绘制结果不缓存，下次请求重新下载
+        if self.complete:
+            chamber_tile_cache.set(tile_key, chamber)
         return chamber
 
+    def assets(self, variant_data: VariantModel) -> Dict[Tuple[str, str], str]:
+        """获取所需图片素材。包括所需各间的间之秘宝、敌人
+
+        * ``param variant_data: VariantModel`` 深境螺旋单层变种数据
+        - ``return Dict[Tuple[str, str], str]`` 以 ``(素材类型, 名称)`` 为键的图标 URL
+        """
+
+        chambers = (
+            [variant_data.chambers[self.chamber_id - 1]]
+            if self.picture_mode == "vertical"
+            else variant_data.chambers[:3]
+        )
+        targets: Dict[Tuple[str, str], str] = {}
+        for chamber_data in chambers:
+            for reward in chamber_data.reward:
+                targets[("reward", reward.name)] = hhw_icon_url(reward.icon)
+            for monsters_half in [
+                chamber_data.monsters.first_half,
+                chamber_data.monsters.second_half,
+            ]:
+                for monster in monsters_half or []:
+                    targets[("monster", monster.name)] = hhw_icon_url(monster.icon)
+        return targets
+
+    async def download_assets(self, variant_data: VariantModel) -> bool:
+        """下载图片素材。包括所需各间的间之秘宝、敌人
+
+        * ``param variant_data: VariantModel`` 深境螺旋单层变种数据
+        - ``return bool`` 图片素材是否完整
+        """
+
+        return await download_icons(self.assets(variant_data))
+
+    def render(
+        self, variant_data: VariantModel, schedule_data: ScheduleItemModel
+    ) -> bytes:
+        """绘制深境螺旋速览图。同步执行，可在线程池或绘图进程中调用
+
+        * ``param variant_data: VariantModel`` 深境螺旋单层变种数据
+        * ``param schedule_data: ScheduleItemModel`` 深境螺旋日程数据
+        - ``return bytes`` 深境螺旋速览图编码数据
+        """
+
+        header = self.draw_header(schedule_data.blessing, variant_data.disorders)
+
+        # 根据深渊速览图片模式决定各部分图片合并规则
+        if self.picture_mode == "vertical":
+            chambers = [self.draw_chamber(variant_data.chambers[self.chamber_id - 1])]
+        else:  # "horizontal"
+            chambers = [
+                self.draw_chamber(variant_data.chambers[_idx], _idx + 1)
+                for _idx in range(3)
+            ]
+
+        # 单间竖直排列于头部下方，全层各间水平排列
+        with metrics.stage("quickview.composite"):
+            result = Image.new(
+                "RGBA",
+                (700 * len(chambers), header.height + max(i.height for i in chambers)),
+                BG_COLOR,
+            )
+            result.paste(header, (0, 0), header)
+            for _idx, chamber in enumerate(chambers):
+                result.paste(chamber, (700 * _idx, header.height), chamber)
+
+        with metrics.stage("quickview.encode"):
+            return encode_image(result, plugin_config.gsabyss_quickview_format, "深渊速览图")
+
+    def lookup(self) -> Tuple[Optional[VariantModel], Optional[ScheduleItemModel]]:
+        """查找深境螺旋单层变种数据与日程数据
+
+        - ``return Tuple[Optional[VariantModel], Optional[ScheduleItemModel]]`` 单层变种数据、日程数据。未找到时为空
+        """  # noqa: E501
+
+        schedule_data = self.INDEX.schedules.get(self.schedule_key)
+        return (
+            self.INDEX.variants.get(
+                (self.floor_id, self.variant_of(schedule_data) or 0)
+            ),
+            schedule_data,
+        )
+
+    def prepare(
+        self,
+    ) -> Tuple[
+        Optional[VariantModel], Optional[ScheduleItemModel], Tuple, Optional[bytes]
+    ]:
+        """查找数据、计算缓存键并读取缓存。涉及数据库与磁盘读取，需在线程池中调用
+
+        - ``return Tuple[Optional[VariantModel], Optional[ScheduleItemModel], Tuple, Optional[bytes]]`` 单层变种数据、日程数据、缓存键、已缓存的速览图。未找到数据时后三项为空
+        """  # noqa: E501
+
+        variant_data, schedule_data = self.lookup()
+        if not variant_data or not schedule_data:
+            return variant_data, schedule_data, (), None
+        cache_key = self.cache_key
+        return variant_data, schedule_data, cache_key, quickview_cache.get(cache_key)
+
+    async def draw_picture(
+        self,
+        variant_data: VariantModel,
+        schedule_data: ScheduleItemModel,
+        cache_key: Tuple,
+    ) -> bytes:
+        """下载图片素材并绘制深境螺旋速览图，写入缓存
+
+        * ``param variant_data: VariantModel`` 深境螺旋单层变种数据
+        * ``param schedule_data: ScheduleItemModel`` 深境螺旋日程数据
+        * ``param cache_key: Tuple`` 缓存键
+        - ``return bytes`` 深境螺旋速览图编码数据
+        """
+
+        with metrics.stage("quickview.download"):
+            self.complete = await self.download_assets(variant_data)
+
+        with metrics.stage("quickview.render"):
+            # 性能分析仅在当前进程中进行
+            if render_pool.enabled and not profiler.armed:
+                res = await render_pool.submit(
+                    render_quickview,
+                    self.floor_id,
+                    self.chamber_id,
+                    self.schedule_key,
+                    hhw_dataset.version,
+                    self.complete,
+                )
+            else:
+                res = await run_sync(profiler.run)(
+                    f"quickview-{self.floor_id}-{self.chamber_id}-{self.schedule_key}",
+                    self.render,
+                    variant_data,
+                    schedule_data,
+                )
+
+        if self.complete:
+            await run_sync(quickview_cache.set)(cache_key, res)
+        return res
+
     async def get_full_picture(self) -> Union[str, BytesIO]:
         """深境螺旋速览图生成入口
 
         - ``return Union[str, BytesIO]`` 深境螺旋速览图 BytesIO。出错时返回字符串
         """
 
-        DATA = self.DATA
-        floor_key = self.floor_key
-        variant_key = self.variant_key
-        schedule_key = self.schedule_key
         schedule_title = self.schedule_title
-        if not variant_key:
+        # 数据库查询在线程池中进行，写入数据时不阻塞事件循环
+        variant_data, schedule_data, cache_key, cached = await run_sync(self.prepare)()
+        if not variant_data or not schedule_data:
             return f"没有找到「{schedule_title}」的深渊数据哦！"
 
-        variant_data = VariantModel.parse_obj(DATA["Floor"][floor_key][variant_key])
-        schedule_data = ScheduleItemModel.parse_obj(DATA["Schedule"][schedule_key])
+        # 使用已绘制的深渊速览图
+        if cached is not None:
+            return BytesIO(cached)
 
-        # 根据深渊速览图片模式决定各部分图片合并规则
-        if self.picture_mode == "vertical":
-            imgs: List[Image.Image] = await asyncio.gather(
-                *[
-                    self.draw_header(
-                        schedule_data.blessing,
-                        variant_data.disorders,
-                    ),
-                    self.draw_chamber(variant_data.chambers[self.chamber_id - 1]),
-                ]
+        if not await wait_init_res():
+            return "插件初始化资源下载失败，请稍后再试！"
+
+        # 相同的并发请求共享同一次绘制
+        res = await render_flight.do(
+            ("quickview", quickview_cache.version, *cache_key),
+            partial(self.draw_picture, variant_data, schedule_data, cache_key),
+        )
+        return BytesIO(res)
+
+
+def render_quickview(
+    floor_id: int, chamber_id: int, schedule_key: str, version: str, complete: bool
+) -> bytes:
+    """绘图进程中绘制深境螺旋速览图。图片素材需已由主进程下载
+
+    * ``param floor_id: int`` 深境螺旋层 ID
+    * ``param chamber_id: int`` 深境螺旋间 ID
+    * ``param schedule_key: str`` 深境螺旋日程数据键名
+    * ``param version: str`` 主进程深渊解析数据版本。与绘图进程不一致时重新加载
+    * ``param complete: bool`` 图片素材是否完整
+    - ``return bytes`` 深境螺旋速览图编码数据
+    """
+
+    if hhw_dataset.version != version:
+        hhw_dataset.load()
+    drawer = AbyssQuickViewDraw(floor_id, chamber_id, schedule_key)
+    drawer.complete = complete
+    variant_data, schedule_data = drawer.lookup()
+    assert variant_data and schedule_data
+    return drawer.render(variant_data, schedule_data)
+
+
+class AbyssBatchQuickViewDraw:
+    """深境螺旋多层速览绘图类。各层全层速览共用头部，合并为一张图片"""
+
+    def __init__(self, floor_ids: List[int], schedule_key: str) -> None:
+        """
+        * ``param floor_ids: List[int]`` 深境螺旋层 ID 列表
+        * ``param schedule_key: str`` 深境螺旋日程数据键名
+        """
+
+        self.floor_ids = floor_ids
+        self.schedule_key = schedule_key
+        self.floors = [AbyssQuickViewDraw(_id, 0, schedule_key) for _id in floor_ids]
+        """各层全层速览绘图实例。单间图像与单层速览共用缓存"""
+        self.complete = True
+        """图片素材是否完整。不完整时绘制结果不缓存"""
+
+    @property
+    def INDEX(self) -> HHWStore:
+        """Honey Hunter World 深渊解析数据索引。各层共用首层固定的索引"""
+
+        index = self.floors[0].INDEX
+        for floor in self.floors[1:]:
+            floor._index = index
+        return index
+
+    @property
+    def floor_title(self) -> str:
+        """标题中的层数"""
+
+        return f"{self.floor_ids[0]}-{self.floor_ids[-1]}"
+
+    @property
+    def cache_key(self) -> Tuple[Any, ...]:
+        """深渊速览图缓存键。以所用日程、各层变种记录的摘要结尾"""
+
+        return (
+            self.schedule_key,
+            self.floor_title,
+            0,
+            plugin_config.gsabyss_quickview_format,
+            self.INDEX.schedules.digest(self.schedule_key),
+            *(
+                self.INDEX.variants.digest((floor.floor_id, floor.variant_id or 0))
+                for floor in self.floors
+            ),
+        )
+
+    def lookup(
+        self,
+    ) -> Tuple[List[Optional[VariantModel]], Optional[ScheduleItemModel]]:
+        """查找各层变种数据与日程数据。日程数据仅查找一次
+
+        - ``return Tuple[List[Optional[VariantModel]], Optional[ScheduleItemModel]]`` 各层变种数据、日程数据。未找到时为空
+        """  # noqa: E501
+
+        schedule_data = self.INDEX.schedules.get(self.schedule_key)
+        return [
+            self.INDEX.variants.get(
+                (floor.floor_id, floor.variant_of(schedule_data) or 0)
             )
-            result = Image.new("RGBA", (700, imgs[0].height + imgs[1].height), BG_COLOR)
-            result.paste(imgs[0], (0, 0), imgs[0])
-            result.paste(imgs[1], (0, imgs[0].height), imgs[1])
-        else:  # "horizontal"
-            tasks = [
-                self.draw_header(
-                    schedule_data.blessing,
-                    variant_data.disorders,
-                )
-            ]
-            tasks.extend(
+            for floor in self.floors
+        ], schedule_data
+
+    def merge_disorders(self, variants: List[VariantModel]) -> List[str]:
+        """合并各层地脉异常。各层相同时仅列出一次，否则标注层数
+
+        * ``param variants: List[VariantModel]`` 各层变种数据
+        - ``return List[str]`` 地脉异常
+        """
+
+        if all(v.disorders == variants[0].disorders for v in variants):
+            return variants[0].disorders
+        return [
+            f"{floor_id} 层：{disorder}"
+            for floor_id, variant in zip(self.floor_ids, variants)
+            for disorder in variant.disorders
+        ]
+
+    def render(
+        self, variants: List[VariantModel], schedule_data: ScheduleItemModel
+    ) -> bytes:
+        """绘制多层速览图。同步执行，可在线程池或绘图进程中调用
+
+        * ``param variants: List[VariantModel]`` 各层变种数据
+        * ``param schedule_data: ScheduleItemModel`` 深境螺旋日程数据
+        - ``return bytes`` 深境螺旋速览图编码数据
+        """
+
+        header = self.floors[0].draw_header(
+            schedule_data.blessing, self.merge_disorders(variants), self.floor_title
+        )
+        rows = []
+        for floor, variant_data in zip(self.floors, variants):
+            floor.complete = self.complete
+            rows.append(
                 [
-                    self.draw_chamber(
-                        variant_data.chambers[_idx],
-                        _idx + 1,
-                    )
+                    floor.draw_chamber(variant_data.chambers[_idx], _idx + 1)
                     for _idx in range(3)
                 ]
             )
-            imgs: List[Image.Image] = await asyncio.gather(*tasks)
-            result = Image.new(
-                "RGBA",
-                (700 * 3, imgs[0].height + max(i.height for i in imgs[1:])),
-                BG_COLOR,
-            )
-            result.paste(imgs[0], (0, 0), imgs[0])
-            result.paste(imgs[1], (0, imgs[0].height), imgs[1])
-            result.paste(imgs[2], (700, imgs[0].height), imgs[2])
-            result.paste(imgs[3], (700 * 2, imgs[0].height), imgs[3])
-
-        # 返回 BytesIO
-        buf = BytesIO()
-        result = result.convert("RGB").save(buf, format="JPEG", quality=100)
-        return buf
+
+        # 各层依次排列于头部下方，每层各间水平排列
+        with metrics.stage("quickview.composite"):
+            heights = [max(i.height for i in row) for row in rows]
+            # 直接合并至 RGB 图像，编码前无需再转换整张图片
+            result = Image.new("RGB", (700 * 3, header.height + sum(heights)), BG_COLOR)
+            result.paste(header, (0, 0), header)
+            y = header.height
+            for row, height in zip(rows, heights):
+                for _idx, chamber in enumerate(row):
+                    result.paste(chamber, (700 * _idx, y), chamber)
+                y += height
+
+        with metrics.stage("quickview.encode"):
+            return encode_image(result, plugin_config.gsabyss_quickview_format, "深渊速览图")
+
+    def prepare(
+        self,
+    ) -> Tuple[
+        List[Optional[VariantModel]],
+        Optional[ScheduleItemModel],
+        Tuple,
+        Optional[bytes],
+    ]:
+        """查找数据、计算缓存键并读取缓存。涉及数据库与磁盘读取，需在线程池中调用
+
+        - ``return Tuple[List[Optional[VariantModel]], Optional[ScheduleItemModel], Tuple, Optional[bytes]]`` 各层变种数据、日程数据、缓存键、已缓存的速览图。未找到数据时后两项为空
+        """  # noqa: E501
+
+        variants, schedule_data = self.lookup()
+        if not schedule_data or not all(variants):
+            return variants, schedule_data, (), None
+        cache_key = self.cache_key
+        return variants, schedule_data, cache_key, quickview_cache.get(cache_key)
+
+    async def draw_picture(
+        self,
+        variants: List[VariantModel],
+        schedule_data: ScheduleItemModel,
+        cache_key: Tuple,
+    ) -> bytes:
+        """一次下载各层图片素材并绘制多层速览图，写入缓存
+
+        * ``param variants: List[VariantModel]`` 各层变种数据
+        * ``param schedule_data: ScheduleItemModel`` 深境螺旋日程数据
+        * ``param cache_key: Tuple`` 缓存键
+        - ``return bytes`` 深境螺旋速览图编码数据
+        """
+
+        targets: Dict[Tuple[str, str], str] = {}
+        for floor, variant_data in zip(self.floors, variants):
+            targets.update(floor.assets(variant_data))
+        with metrics.stage("quickview.download"):
+            self.complete = await download_icons(targets)
+
+        with metrics.stage("quickview.render"):
+            # 各层在同一绘图任务中绘制
+            if render_pool.enabled and not profiler.armed:
+                res = await render_pool.submit(
+                    render_batch_quickview,
+                    self.floor_ids,
+                    self.schedule_key,
+                    hhw_dataset.version,
+                    self.complete,
+                )
+            else:
+                res = await run_sync(profiler.run)(
+                    f"quickview-{self.floor_title}-{self.schedule_key}",
+                    self.render,
+                    variants,
+                    schedule_data,
+                )
+
+        if self.complete:
+            await run_sync(quickview_cache.set)(cache_key, res)
+        return res
+
+    async def get_full_picture(self) -> Union[str, BytesIO]:
+        """深境螺旋多层速览图生成入口
+
+        - ``return Union[str, BytesIO]`` 深境螺旋速览图 BytesIO。出错时返回字符串
+        """
+
+        schedule_title = self.floors[0].schedule_title
+        variants, schedule_data, cache_key, cached = await run_sync(self.prepare)()
+        if not schedule_data or not all(variants):
+            return f"没有找到「{schedule_title}」的深渊数据哦！"
+
+        if cached is not None:
+            return BytesIO(cached)
+
+        if not await wait_init_res():
+            return "插件初始化资源下载失败，请稍后再试！"
+
+        res = await render_flight.do(
+            ("quickview", quickview_cache.version, *cache_key),
+            partial(self.draw_picture, variants, schedule_data, cache_key),
+        )
+        return BytesIO(res)
+
+
+async def download_icons(targets: Dict[Tuple[str, str], str]) -> bool:
+    """并发下载图标
+
+    * ``param targets: Dict[Tuple[str, str], str]`` 以 ``(素材类型, 名称)`` 为键的图标 URL
+    - ``return bool`` 图标是否全部下载成功
+    """
+
+    return all(
+        await asyncio.gather(
+            *(download_pic(url, dir, name) for (dir, name), url in targets.items())
+        )
+    )
+
+
+def render_batch_quickview(
+    floor_ids: List[int], schedule_key: str, version: str, complete: bool
+) -> bytes:
+    """绘图进程中绘制深境螺旋多层速览图。图片素材需已由主进程下载
+
+    * ``param floor_ids: List[int]`` 深境螺旋层 ID 列表
+    * ``param schedule_key: str`` 深境螺旋日程数据键名
+    * ``param version: str`` 主进程深渊解析数据版本。与绘图进程不一致时重新加载
+    * ``param complete: bool`` 图片素材是否完整
+    - ``return bytes`` 深境螺旋速览图编码数据
+    """
+
+    if hhw_dataset.version != version:
+        hhw_dataset.load()
+    drawer = AbyssBatchQuickViewDraw(floor_ids, schedule_key)
+    drawer.complete = complete
+    variants, schedule_data = drawer.lookup()
+    assert schedule_data and all(variants)
+    return drawer.render(variants, schedule_data)  # type: ignore
@@ -1,17 +1,24 @@
 import asyncio
 from io import BytesIO
-from typing import List
+from typing import List, Union
 
 from PIL import Image, ImageDraw
 from nonebot.utils import run_sync
 
-from .data_source import DL_DIR, download_pic
+from .metrics import metrics
+from .profiler import profiler
+from .cache import render_flight
+from .config import plugin_config
+from .render_pool import render_pool
+from .data_source import download_pic, wait_init_res
 from .models.akasha import (
+    TOP_TEAMS,
+    TOP_CHARACTERS,
     LastRate,
     TeamItem,
     CharacterItem,
     AbyssTotalView,
-    AkashaAbyssData,
+    AkashaRenderData,
 )
 from .draw_utils import (
     WHITE,
@@ -24,17 +31,14 @@ from .draw_utils import (
     RARITY5,
     BG_COLOR,
     BG_LIGHT,
-    RESAMPLE,
     NEG_COLOR,
     POS_COLOR,
-    _f16,
-    _f24,
-    _gsf16,
-    _gsf20,
-    _gsf32,
-    _half_img,
-    _gsf16_char_height,
-    _gsf20_char_height,
+    SMILEY_FONT,
+    font,
+    half_img,
+    load_icon,
+    char_height,
+    encode_image,
     rounded_rectangle_mask,
 )
 
@@ -42,17 +46,15 @@ from .draw_utils import (
 class AbyssStatisticDraw:
     """深境螺旋统计绘图类"""
 
-    _mask_50r7 = rounded_rectangle_mask(mask=True)
-
-    def __init__(self, akasha_data: AkashaAbyssData) -> None:
+    def __init__(self, akasha_data: AkashaRenderData) -> None:
         """
-        * ``param akasha_data: Dict[str, Any]`` Akasha Database 深渊统计数据
+        * ``param akasha_data: AkashaRenderData`` Akasha Database 深渊统计数据
         """
 
         self.DATA = akasha_data
         """Akasha Database 深渊统计数据"""
 
-    @run_sync
+    @metrics.timed("statistic.draw_top")
     def draw_top(
         self,
         modify_time: str,
@@ -75,18 +77,18 @@ class AbyssStatisticDraw:
         # 标题
         title = f"{schedule_version_desc[:3]} {schedule_version_desc[3:]} 深渊统计"
         drawer.text(
-            (int((700 - _gsf32.getlength(title)) / 2), 20),
+            (int((700 - font(32).getlength(title)) / 2), 20),
             title,
             fill=YELLOW,
-            font=_gsf32,
+            font=font(32),
         )
         # 描述
         description = f"虚空数据库出战人数 {abyss_total_view.person_war}    更新时间 {modify_time}"
         drawer.text(
-            (int((700 - _f24.getlength(description)) / 2), 70),
+            (int((700 - font(24, SMILEY_FONT).getlength(description)) / 2), 70),
             description,
             fill=ORANGE,
-            font=_f24,
+            font=font(24, SMILEY_FONT),
         )
         # 数据汇总
         total_view_items = [
@@ -107,15 +109,17 @@ class AbyssStatisticDraw:
             start_x, end_x = (40, 330) if _idx < 3 else (370, 700 - 40)
             start_y = 120 + 40 * (_idx % 3)
             # 项目标题
-            drawer.text((start_x, start_y), items[0], fill=YELLOW, font=_f24)
+            drawer.text(
+                (start_x, start_y), items[0], fill=YELLOW, font=font(24, SMILEY_FONT)
+            )
             # 项目内容
-            value_start_y = int(start_y + 13 - _gsf20_char_height / 2)
+            value_start_y = int(start_y + 13 - char_height(20) / 2)
             if len(items) == 2:
                 drawer.text(
-                    (end_x - _gsf20.getlength(items[1]), value_start_y),
+                    (end_x - font(20).getlength(items[1]), value_start_y),
                     items[1],
                     fill=WHITE,
-                    font=_gsf20,
+                    font=font(20),
                 )
             else:
                 # 含上期变化的项目绘制
@@ -124,7 +128,7 @@ class AbyssStatisticDraw:
                 else:
                     value_str, diff_str = items[1], items[-1]
                 diff_str = diff_str if diff_str.startswith("-") else f"+{diff_str}"
-                diff_width = _gsf20.getlength(diff_str)
+                diff_width = font(20).getlength(diff_str)
                 diff_bg = rounded_rectangle_mask(
                     diff_width + 10,
                     26,
@@ -136,21 +140,21 @@ class AbyssStatisticDraw:
                     (end_x - diff_width - 5, value_start_y),
                     diff_str,
                     fill=POS_COLOR if float(items[-1]) >= 0 else NEG_COLOR,
-                    font=_gsf20,
+                    font=font(20),
                 )
                 drawer.text(
                     (
-                        end_x - diff_width - 10 - 10 - _gsf20.getlength(value_str),
+                        end_x - diff_width - 10 - 10 - font(20).getlength(value_str),
                         value_start_y,
                     ),
                     value_str,
                     fill=WHITE,
-                    font=_gsf20,
+                    font=font(20),
                 )
 
         return result
 
-    @run_sync
+    @metrics.timed("statistic.draw_middle")
     def draw_middle(self, character_used_list: List[CharacterItem]) -> Image.Image:
         """绘制中间。包含使用排行
 
@@ -161,18 +165,15 @@ class AbyssStatisticDraw:
         result = Image.new("RGBA", (700, 375), BG_COLOR)
         drawer = ImageDraw.Draw(result)
 
-        drawer.text((20, 25), "第 12 层使用排行", fill=YELLOW, font=_f24)
+        drawer.text((20, 25), "第 12 层使用排行", fill=YELLOW, font=font(24, SMILEY_FONT))
 
         drawer.rectangle((20, 65, 680, 375), fill=BG_LIGHT, width=0)
-        for _idx, char in enumerate(character_used_list[:30]):
+        for _idx, char in enumerate(character_used_list[:TOP_CHARACTERS]):
             start_x = 32 + 65 * (_idx % 10)
             start_y = 85 + 100 * (_idx // 10)
-            icon_path = DL_DIR / f"char/{char.name}.png"
-            if icon_path.exists():
+            icon_img = load_icon("char", char.name, 50, mask=True)
+            if icon_img:
                 # 存在从虚空数据库直接下载的图标
-                icon_img = Image.open(icon_path).convert("RGBA")
-                icon_img = icon_img.resize((50, 50), resample=RESAMPLE)
-                icon_img.putalpha(AbyssStatisticDraw._mask_50r7)
                 result.paste(icon_img, (start_x, start_y), icon_img)
             else:
                 # 图标不存在时绘制文字
@@ -183,26 +184,30 @@ class AbyssStatisticDraw:
                 )
                 drawer.text(
                     (
-                        int(start_x + 25 - _gsf16.getlength(char.name) / 2),
-                        int(start_y + 25 - _gsf16_char_height / 2),
+                        int(start_x + 25 - font(16).getlength(char.name) / 2),
+                        int(start_y + 25 - char_height(16) / 2),
                     ),
                     char.name,
                     fill=WHITE,
-                    font=_gsf16,
+                    font=font(16),
                 )
             drawer.text(
                 (
-                    int(start_x + 25 - _f16.getlength(f"{char.value}%") / 2),
+                    int(
+                        start_x
+                        + 25
+                        - font(16, SMILEY_FONT).getlength(f"{char.value}%") / 2
+                    ),
                     start_y + 59,
                 ),
                 f"{char.value}%",
                 fill=WHITE,
-                font=_f16,
+                font=font(16, SMILEY_FONT),
             )
 
         return result
 
-    @run_sync
+    @metrics.timed("statistic.draw_buttom")
     def draw_buttom(
         self,
         team_up_list: List[TeamItem],
@@ -223,9 +228,11 @@ class AbyssStatisticDraw:
         result = Image.new("RGBA", (700, 595), BG_COLOR)
         drawer = ImageDraw.Draw(result)
 
-        drawer.text((20, 25), "第 12 层热门队伍", fill=YELLOW, font=_f24)
+        drawer.text((20, 25), "第 12 层热门队伍", fill=YELLOW, font=font(24, SMILEY_FONT))
 
-        for group_idx, teams in enumerate([team_up_list[:5], team_down_list[:5]]):
+        for group_idx, teams in enumerate(
+            [team_up_list[:TOP_TEAMS], team_down_list[:TOP_TEAMS]]
+        ):
             group_start_x, group_start_y = (360 if group_idx else 20), 65
             drawer.rectangle(
                 (
@@ -237,11 +244,8 @@ class AbyssStatisticDraw:
                 fill=BG_LIGHT,
                 width=0,
             )
-            if not group_idx:
-                half_icon = _half_img
-            else:
-                # 下半间的图标由原图标上下翻转生成
-                half_icon = _half_img.transpose(Image.FLIP_TOP_BOTTOM)
+            # 下半间的图标由原图标上下翻转生成
+            half_icon = half_img(flip=bool(group_idx))
             result.paste(
                 half_icon, (group_start_x + 320 - 12, group_start_y - 12), half_icon
             )
@@ -253,27 +257,24 @@ class AbyssStatisticDraw:
                     (team_start_x + 3, team_start_y + 59),
                     f"出场 {team.dc if group_idx else team.uc}",
                     fill=WHITE,
-                    font=_gsf16,
+                    font=font(16),
                 )
                 right_string = f"满星 {team.dmr if group_idx else team.umr}%"
                 drawer.text(
                     (
-                        team_start_x + 260 - 3 - _gsf16.getlength(right_string),
+                        team_start_x + 260 - 3 - font(16).getlength(right_string),
                         team_start_y + 59,
                     ),
                     right_string,
                     fill=WHITE,
-                    font=_gsf16,
+                    font=font(16),
                 )
                 for char_idx, char_short_id in enumerate(team.tl):
                     char = _char_list[10000000 + char_short_id]
                     char_start_x = team_start_x + 70 * char_idx
-                    icon_path = DL_DIR / f"char/{char.name}.png"
-                    if icon_path.exists():
+                    icon_img = load_icon("char", char.name, 50, mask=True)
+                    if icon_img:
                         # 存在从虚空数据库直接下载的图标
-                        icon_img = Image.open(icon_path).convert("RGBA")
-                        icon_img = icon_img.resize((50, 50), resample=RESAMPLE)
-                        icon_img.putalpha(AbyssStatisticDraw._mask_50r7)
                         result.paste(icon_img, (char_start_x, team_start_y), icon_img)
                     else:
                         # 图标不存在时绘制文字
@@ -290,58 +291,104 @@ class AbyssStatisticDraw:
                         drawer.text(
                             (
                                 int(
-                                    char_start_x + 25 - _gsf16.getlength(char.name) / 2
+                                    char_start_x
+                                    + 25
+                                    - font(16).getlength(char.name) / 2
                                 ),
-                                int(team_start_y + 25 - _gsf16_char_height / 2),
+                                int(team_start_y + 25 - char_height(16) / 2),
                             ),
                             char.name,
                             fill=WHITE,
-                            font=_gsf16,
+                            font=font(16),
                         )
 
         return result
 
-    async def get_full_picture(self) -> BytesIO:
-        """深境螺旋统计图生成入口
+    def render(self) -> bytes:
+        """绘制深境螺旋统计图。同步执行，可在线程池或绘图进程中调用
+
+        - ``return bytes`` 深境螺旋统计图编码数据
+        """
+
+        # 绘制图片各部分
+        imgs = [
+            self.draw_top(
+                self.DATA.modify_time,
+                self.DATA.schedule_version_desc,
+                self.DATA.abyss_total_view,
+                self.DATA.last_rate,
+            ),
+            self.draw_middle(self.DATA.character_used_list),
+            self.draw_buttom(
+                self.DATA.team_up_list,
+                self.DATA.team_down_list,
+                self.DATA.character_used_list,
+            ),
+        ]
+        with metrics.stage("statistic.composite"):
+            result = Image.new("RGBA", (700, 1220), BG_COLOR)
+            result.paste(imgs[0], (0, 0), imgs[0])
+            result.paste(imgs[1], (0, imgs[0].height), imgs[1])
+            result.paste(imgs[2], (0, imgs[0].height + imgs[1].height), imgs[2])
 
-        - ``return BytesIO`` 深境螺旋统计图 BytesIO
+        with metrics.stage("statistic.encode"):
+            return encode_image(result, plugin_config.gsabyss_statistic_format, "深渊统计图")
+
+    async def draw_picture(self) -> bytes:
+        """下载图标并绘制深境螺旋统计图
+
+        - ``return bytes`` 深境螺旋统计图编码数据
         """
 
         # 图标下载
         download_tasks = [
             download_pic(
-                f"https://t.akashadata.com/xstatic/img/c/s/{char.en_name}.jpg",
+                f"{plugin_config.gsabyss_akasha_icon_url}{char.en_name}.jpg",
                 "char",
                 char.name,
             )
             for char in self.DATA.character_used_list
         ]
-        await asyncio.gather(*download_tasks)
+        with metrics.stage("statistic.download"):
+            await asyncio.gather(*download_tasks)
         download_tasks.clear()
 
-        # 绘制图片各部分
-        imgs: List[Image.Image] = await asyncio.gather(
-            *[
-                self.draw_top(
-                    self.DATA.modify_time,
-                    self.DATA.schedule_version_desc,
-                    self.DATA.abyss_total_view,
-                    self.DATA.last_rate,
-                ),
-                self.draw_middle(self.DATA.character_used_list),
-                self.draw_buttom(
-                    self.DATA.team_up_list,
-                    self.DATA.team_down_list,
-                    self.DATA.character_used_list,
-                ),
-            ]
+        with metrics.stage("statistic.render"):
+            # 性能分析仅在当前进程中进行
+            if render_pool.enabled and not profiler.armed:
+                return await render_pool.submit(render_statistic, self.DATA)
+            return await run_sync(profiler.run)(
+                f"statistic-{self.DATA.schedule_id}-{self.DATA.modify_time}",
+                self.render,
+            )
+
+    async def get_full_picture(self) -> Union[str, BytesIO]:
+        """深境螺旋统计图生成入口
+
+        - ``return Union[str, BytesIO]`` 深境螺旋统计图 BytesIO。出错时返回字符串
+        """
+
+        if not await wait_init_res():
+            return "插件初始化资源下载失败，请稍后再试！"
+
+        # 相同的并发请求共享同一次绘制
+        res = await render_flight.do(
+            (
+                "statistic",
+                self.DATA.schedule_id,
+                self.DATA.modify_time,
+                plugin_config.gsabyss_statistic_format,
+            ),
+            self.draw_picture,
         )
-        result = Image.new("RGBA", (700, 1220), BG_COLOR)
-        result.paste(imgs[0], (0, 0), imgs[0])
-        result.paste(imgs[1], (0, imgs[0].height), imgs[1])
-        result.paste(imgs[2], (0, imgs[0].height + imgs[1].height), imgs[2])
-
-        # 返回 BytesIO
-        buf = BytesIO()
-        result = result.convert("RGB").save(buf, format="PNG")
-        return buf
+        return BytesIO(res)
+
+
+def render_statistic(akasha_data: AkashaRenderData) -> bytes:
+    """绘图进程中绘制深境螺旋统计图。图标需已由主进程下载
+
+    * ``param akasha_data: AkashaRenderData`` Akasha Database 深渊统计数据
+    - ``return bytes`` 深境螺旋统计图编码数据
+    """
+
+    return AbyssStatisticDraw(akasha_data).render()
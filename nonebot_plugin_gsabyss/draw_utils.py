@@ -1,50 +1,65 @@
-from typing import Tuple, Union, Literal
+from io import BytesIO
+from time import perf_counter
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union, Literal, Iterable, Optional
 
+from nonebot import get_driver
+from nonebot.log import logger
+from nonebot.utils import run_sync
 from PIL import Image, ImageDraw, ImageFont
 
-from .data_source import download_init_res
+from .cache import LRUCache
+from .data_source import DL_DIR
+from .metrics import metrics, lru_cache_stats
+from .config import EncodeProfile, plugin_config
 
+GS_FONT = "HYWH-85W"
+"""汉仪文黑"""
+SMILEY_FONT = "SmileySans-Oblique"
+"""得意黑"""
+RESAMPLE = getattr(Image, "Resampling", Image).LANCZOS
 
-def font(size: int, family: str = "HYWH-85W") -> ImageFont.FreeTypeFont:
-    """绘图字体获取，默认汉仪文黑"""
 
-    font_path = download_init_res(f"{family}.ttf")
-    return ImageFont.truetype(str(font_path), size=size)
+@lru_cache(maxsize=None)
+def font(size: int, family: str = GS_FONT) -> ImageFont.FreeTypeFont:
+    """绘图字体获取，默认汉仪文黑。首次使用时加载"""
 
+    return ImageFont.truetype(str(DL_DIR / f"{family}.ttf"), size=size)
 
-_gsf64 = font(64)
-"""汉仪文黑 64 号字体"""
-_gsf32 = font(32)
-"""汉仪文黑 32 号字体"""
-_f24 = font(24, "SmileySans-Oblique")
-"""得意黑 24 号字体"""
-_gsf20 = font(20)
-"""汉仪文黑 20 号字体"""
-_f16 = font(16, "SmileySans-Oblique")
-"""得意黑 16 号字体"""
-_gsf16 = font(16)
-"""汉仪文黑 16 号字体"""
 
-_gsf32_char_height = _gsf32.getbbox("高度")[-1]
-"""汉仪文黑 32 号字体高度"""
-_f24_char_height = _f24.getbbox("高度")[-1]
-"""得意黑 24 号字体高度"""
-_gsf20_char_height = _gsf20.getbbox("高度")[-1]
-"""汉仪文黑 20 号字体高度"""
-_gsf16_char_height = _gsf16.getbbox("高度")[-1]
-"""汉仪文黑 16 号字体高度"""
+@lru_cache(maxsize=None)
+def char_height(size: int, family: str = GS_FONT) -> int:
+    """绘图字体高度获取，默认汉仪文黑"""
+
+    return font(size, family).getbbox("高度")[-1]
+
+
+@lru_cache(maxsize=None)
+def star_img() -> Image.Image:
+    """渊星图标"""
+
+    return (
+        Image.open(DL_DIR / "star_icon.png")
+        .resize((24, 24), resample=RESAMPLE)
+        .convert("RGBA")
+    )
+
+
+@lru_cache(maxsize=None)
+def half_img(flip: bool = False) -> Image.Image:
+    """半间图标
+
+    * ``param flip: bool = False`` 是否上下翻转。下半间的图标由原图标上下翻转生成
+    """
+
+    if flip:
+        return half_img().transpose(Image.FLIP_TOP_BOTTOM)
+    return (
+        Image.open(DL_DIR / "half_icon.png")
+        .resize((24, 24), resample=RESAMPLE)
+        .convert("RGBA")
+    )
 
-RESAMPLE = getattr(Image, "Resampling", Image).LANCZOS
-_star_img_path = download_init_res("star_icon.png")
-_star_img = (
-    Image.open(_star_img_path).resize((24, 24), resample=RESAMPLE).convert("RGBA")
-)
-"""渊星图标"""
-_half_img_path = download_init_res("half_icon.png")
-_half_img = (
-    Image.open(_half_img_path).resize((24, 24), resample=RESAMPLE).convert("RGBA")
-)
-"""半间图标"""
 
 BG_COLOR = "#3F4454"
 BG_LIGHT = "#484D5C"
@@ -70,42 +85,153 @@ RARITY_BG = [RARITY1, RARITY2, RARITY3, RARITY4, RARITY5]
 """物品稀有度背景"""
 
 
-def _coord_calc(
-    s: str,
-    start_width: int,
+def warm_fonts() -> None:
+    """预先加载绘图使用的全部字体与图标"""
+
+    for size in [16, 20, 32, 64]:
+        char_height(size)
+    for size in [16, 24]:
+        char_height(size, SMILEY_FONT)
+    star_img()
+    half_img(flip=True)
+
+
+TextSegment = Tuple[float, int, str, str]
+"""文本片段。依次为绘制起点横轴坐标、纵轴坐标、文本、颜色"""
+
+
+@lru_cache(maxsize=None)
+def _advance_table(size: int, family: str) -> Dict[str, float]:
+    """字符宽度与字符对字距调整量表。每种字体一张，随绘制逐步填充"""
+
+    return {}
+
+
+def glyph_advance(s: str, size: int = 20, family: str = GS_FONT) -> float:
+    """字符宽度获取。同一字体的相同字符只测量一次
+
+    * ``param s: str`` 单个字符
+    * ``param size: int = 20`` 字体大小
+    * ``param family: str = GS_FONT`` 字体名称
+    - ``return: float`` 字符宽度
+    """
+
+    table = _advance_table(size, family)
+    advance = table.get(s)
+    if advance is None:
+        advance = table[s] = font(size, family).getlength(s)
+    return advance
+
+
+@lru_cache(maxsize=None)
+def has_kerning(family: str = GS_FONT) -> bool:
+    """字体绘制时是否可能应用字距调整。使用 Raqm 排版时按 ``GPOS`` 表调整，否则仅按 ``kern`` 表调整
+
+    * ``param family: str = GS_FONT`` 字体名称
+    - ``return: bool`` 是否可能应用字距调整
+    """  # noqa: E501
+
+    if font(20, family).layout_engine == ImageFont.Layout.RAQM:
+        return True
+    # 读取 sfnt 表目录
+    with open(DL_DIR / f"{family}.ttf", "rb") as f:
+        header = f.read(12)
+        tables = f.read(16 * int.from_bytes(header[4:6], "big"))
+    return any(tables[i : i + 4] == b"kern" for i in range(0, len(tables), 16))
+
+
+def glyph_kerning(pair: str, size: int = 20, family: str = GS_FONT) -> float:
+    """字符对字距调整量获取。同一字体的相同字符对只测量一次
+
+    * ``param pair: str`` 相邻的两个字符
+    * ``param size: int = 20`` 字体大小
+    * ``param family: str = GS_FONT`` 字体名称
+    - ``return: float`` 字距调整量，即整体宽度与单字宽度之和的差值
+    """
+
+    table = _advance_table(size, family)
+    kerning = table.get(pair)
+    if kerning is None:
+        kerning = table[pair] = (
+            font(size, family).getlength(pair)
+            - glyph_advance(pair[0], size, family)
+            - glyph_advance(pair[1], size, family)
+        )
+    return kerning
+
+
+def layout_text(
+    runs: Iterable[Tuple[str, str]],
+    start_width: float,
     start_height: int,
     max_width: int,
     init_width: int = 0,
     font_size: Literal[16, 20] = 20,
-) -> Tuple[int, int, int]:
-    """字符绘制坐标计算。注意传入参数与传出参数对应关系
+) -> Tuple[List[TextSegment], float, int]:
+    """文本排版。逐字计算换行，同一行内相同颜色的连续文本合并为一个片段。
+    片段整体绘制，字体有字距调整时片段内按字符对计入调整量
 
-    * ``param s: str`` 待绘制字符
-    * ``param start_width: int`` 绘制起点横轴初始坐标
+    * ``param runs: Iterable[Tuple[str, str]]`` 文本与颜色列表
+    * ``param start_width: float`` 绘制起点横轴初始坐标
     * ``param start_height: int`` 绘制起点纵轴初始坐标
     * ``param max_width: int`` 横轴允许的最大坐标，即判断字符是否需要换行的横轴坐标
     * ``param init_width: int = 0`` 横轴允许的最小坐标，即字符需要换行时回归的横轴坐标
     * ``param font_size: Literal[16, 20] = 20`` 字体大小
-    - ``return: Tuple[int, int, int]`` 绘制起点横轴坐标、绘制起点纵轴坐标、下个字绘制起点横轴初始坐标
-    """
+    - ``return: Tuple[List[TextSegment], float, int]`` 文本片段列表、下个字绘制起点横轴坐标、当前行纵轴坐标
+    """  # noqa: E501
 
-    if font_size == 20:
-        _font, line_height, space = _gsf20, _gsf20_char_height, 10
-    else:
-        _font, line_height, space = _gsf16, _gsf16_char_height, 6
+    line_height, space = char_height(font_size), (10 if font_size == 20 else 6)
+    kerning = has_kerning()
 
-    if start_width + _font.getlength(s) <= max_width:
-        coord_x = start_width
-        start_width += _font.getlength(s)
-    else:
-        coord_x, start_width = init_width, init_width + _font.getlength(s)
-        start_height += line_height + space
+    segments: List[TextSegment] = []
+    chars: List[str] = []
+    seg_x, seg_color = start_width, ""
+    for text, color in runs:
+        for s in text:
+            advance = glyph_advance(s, font_size)
+            if kerning and chars and color == seg_color:
+                # 字距调整仅作用于同一片段内的相邻字符
+                advance += glyph_kerning(chars[-1] + s, font_size)
+            if start_width + advance <= max_width:
+                # 同一行内颜色不变时续接当前片段
+                if chars and color != seg_color:
+                    segments.append((seg_x, start_height, "".join(chars), seg_color))
+                    chars = []
+                if not chars:
+                    seg_x, seg_color = start_width, color
+                start_width += advance
+            else:
+                # 换行，结束当前片段
+                if chars:
+                    segments.append((seg_x, start_height, "".join(chars), seg_color))
+                    chars = []
+                seg_x, seg_color = init_width, color
+                start_width = init_width + glyph_advance(s, font_size)
+                start_height += line_height + space
+            chars.append(s)
+    if chars:
+        segments.append((seg_x, start_height, "".join(chars), seg_color))
 
-    # 当前字符绘制坐标为 (coord_x, start_height)
-    # 下个字符绘制坐标初始为 (start_width, start_height)
-    return coord_x, start_height, start_width
+    return segments, start_width, start_height
 
 
+def draw_segments(
+    drawer: ImageDraw.ImageDraw,
+    segments: Iterable[TextSegment],
+    font_size: Literal[16, 20] = 20,
+) -> None:
+    """绘制排版后的文本片段
+
+    * ``param drawer: ImageDraw.ImageDraw`` 绘图对象
+    * ``param segments: Iterable[TextSegment]`` 文本片段列表
+    * ``param font_size: Literal[16, 20] = 20`` 字体大小
+    """
+
+    for x, y, text, color in segments:
+        drawer.text((x, y), text, fill=color, font=font(font_size))
+
+
+@lru_cache(maxsize=128)
 def rounded_rectangle_mask(
     width: Union[int, float] = 50,
     height: Union[int, float] = 50,
@@ -114,7 +240,7 @@ def rounded_rectangle_mask(
     scale: int = 5,
     mask: bool = False,
 ) -> Image.Image:
-    """圆角矩形生成
+    """圆角矩形生成。相同参数只生成一次，返回的图像为缓存共享，不可修改
 
     * ``param width: Union[int, float] = 50`` 矩形宽度
     * ``param height: Union[int, float] = 50`` 矩形高度
@@ -135,3 +261,114 @@ def rounded_rectangle_mask(
         width=0,
     )
     return result.resize((int(width), int(height)), resample=RESAMPLE)
+
+
+icon_cache: LRUCache[Image.Image] = LRUCache(plugin_config.gsabyss_icon_cache_size)
+"""已缩放图标缓存。以 ``(分类, 名称, 尺寸, 是否圆角)`` 为键"""
+metrics.register_cache("icon", lambda: icon_cache.stats)
+
+_KEEP_RATIO_CATEGORIES = {"reward"}
+"""保持比例缩放的图标分类。HHW 物品图标可能非正方形"""
+
+
+def load_icon(
+    category: str, name: str, size: int, mask: bool = False
+) -> Optional[Image.Image]:
+    """读取可直接粘贴的图标。返回的图像为缓存共享，不可修改
+
+    * ``param category: str`` 图标分类，即下载目录名。如 ``reward``、``monster``、``char``
+    * ``param name: str`` 图标名称
+    * ``param size: int`` 图标尺寸。保持比例缩放的分类中为较长边的长度
+    * ``param mask: bool = False`` 是否裁切为 7px 圆角
+    - ``return: Optional[Image.Image]`` 图标图像。图标文件不存在时返回空
+    """
+
+    key = (category, name, size, mask)
+    icon_img = icon_cache.get(key)
+    if icon_img is not None:
+        return icon_img
+
+    icon_path = DL_DIR / f"{category}/{name}.png"
+    if not icon_path.exists():
+        return None
+    icon_img = Image.open(icon_path).convert("RGBA")
+    if category in _KEEP_RATIO_CATEGORIES:
+        icon_img = icon_img.resize(
+            (size, int(icon_img.height * size / icon_img.width))
+            if icon_img.width >= icon_img.height
+            else (int(icon_img.width * size / icon_img.height), size),
+            resample=RESAMPLE,
+        )
+    else:
+        icon_img = icon_img.resize((size, size), resample=RESAMPLE)
+    if mask:
+        icon_img.putalpha(rounded_rectangle_mask(size, size, mask=True))
+
+    icon_cache.set(key, icon_img)
+    return icon_img
+
+
+@lru_cache(maxsize=32)
+def filled_rectangle(width: int, height: int, fill: str) -> Image.Image:
+    """纯色矩形生成。相同参数只生成一次，返回的图像为缓存共享，不可修改
+
+    * ``param width: int`` 矩形宽度
+    * ``param height: int`` 矩形高度
+    * ``param fill: str`` 矩形区域填充色
+    - ``return: Image.Image`` 纯色矩形
+    """
+
+    return Image.new("RGBA", (width, height), fill)
+
+
+metrics.register_cache("rounded_mask", lru_cache_stats(rounded_rectangle_mask))
+metrics.register_cache("filled_rectangle", lru_cache_stats(filled_rectangle))
+
+
+ENCODE_PROFILES: Dict[str, Tuple[str, Dict[str, Union[int, bool]]]] = {
+    "jpeg": ("JPEG", {"quality": 90, "optimize": True, "progressive": True}),
+    "jpeg-hq": ("JPEG", {"quality": 100}),
+    "webp": ("WEBP", {"quality": 90, "method": 4}),
+    "png": ("PNG", {}),
+    "png8": ("PNG", {"optimize": True}),
+}
+"""图片编码方案。``{方案: (格式, 编码参数)}``"""
+
+
+def encode_image(img: Image.Image, profile: EncodeProfile, name: str = "") -> bytes:
+    """按编码方案编码图片，记录编码大小与耗时
+
+    * ``param img: Image.Image`` 待编码图片，透明通道将被丢弃
+    * ``param profile: EncodeProfile`` 编码方案
+    * ``param name: str = ""`` 图片名称，仅用于日志
+    - ``return: bytes`` 编码数据
+    """
+
+    start = perf_counter()
+    fmt, params = ENCODE_PROFILES[profile]
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if profile == "png8":
+        # 统计图以纯色块为主，量化为 256 色调色板
+        img = img.quantize(256, method=Image.Quantize.FASTOCTREE)
+    buf = BytesIO()
+    img.save(buf, format=fmt, **params)
+    res = buf.getvalue()
+    logger.debug(
+        f"{name or '图片'} 以 {profile} 编码完成，"
+        f"大小 {len(res) / 1024:.1f} KB，耗时 {(perf_counter() - start) * 1000:.1f} ms"
+    )
+    return res
+
+
+@get_driver().on_startup
+async def warm_shapes() -> None:
+    """启动时预先生成已知尺寸的圆角遮罩与纯色矩形"""
+
+    def _warm() -> None:
+        # 角色图标圆角遮罩
+        rounded_rectangle_mask(50, 50, mask=True)
+        # 间之秘宝数量背景
+        filled_rectangle(60, 20, BG_CNT)
+
+    await run_sync(_warm)()
@@ -0,0 +1,371 @@
+import os
+import json
+import sqlite3
+from hashlib import md5
+from pathlib import Path
+from threading import Lock
+from functools import partial
+from time import perf_counter
+from typing import (
+    Any,
+    Set,
+    Dict,
+    List,
+    Type,
+    Tuple,
+    Mapping,
+    TypeVar,
+    Callable,
+    Iterator,
+    Optional,
+    Sequence,
+)
+
+from nonebot.log import logger
+from pydantic import BaseModel
+from pydantic.error_wrappers import ValidationError
+
+from .cache import LRUCache
+from .metrics import metrics
+from .models.trusted import construct_trusted
+from .models.hhw import VariantModel, ScheduleItemModel
+
+K = TypeVar("K")
+M = TypeVar("M", bound=BaseModel)
+
+SCHEMA_VERSION = "2"
+"""存储结构版本。结构变化时需要重新写入"""
+
+RECORD_CACHE_SIZE = 32
+"""已解析记录的内存缓存数量"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS variants (
+    floor INTEGER NOT NULL,
+    variant INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (floor, variant)
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+
+def record_digest(text: str) -> str:
+    """计算单条记录摘要"""
+
+    return md5(text.encode("UTF-8")).hexdigest()[:8]
+
+
+class RecordTable(Mapping[K, M]):
+    """存储中的单个数据表。按键读取时才解析对应记录"""
+
+    def __init__(
+        self,
+        store: "HHWStore",
+        model: Callable[..., M],
+        table: str,
+        columns: Tuple[str, ...],
+        to_params: Callable[[K], Sequence[Any]],
+    ) -> None:
+        """
+        * ``param store: HHWStore`` 所属存储
+        * ``param model: Callable[..., M]`` 记录解析函数
+        * ``param table: str`` 表名
+        * ``param columns: Tuple[str, ...]`` 主键列名
+        * ``param to_params: Callable[[K], Sequence[Any]]`` 键转换为主键列值的函数
+        """
+
+        self._store = store
+        self._model = model
+        self._table = table
+        self._to_params = to_params
+        where = " AND ".join(f"{column} = ?" for column in columns)
+        self._select = f"SELECT data FROM {table} WHERE {where}"
+        self._select_digest = f"SELECT digest FROM {table} WHERE {where}"
+        self._keys = f"SELECT {', '.join(columns)} FROM {table} ORDER BY 1"
+
+    def __getitem__(self, key: K) -> M:
+        params = self._to_params(key)
+        cache_key = (self._table, *params)
+        record = self._store.records.get(cache_key)
+        if record is not None:
+            return record  # type: ignore
+        with metrics.stage("hhw.lookup"):
+            row = self._store.query(self._select, params)
+            if row is None:
+                raise KeyError(key)
+            record = self._model(json.loads(row[0]))
+        self._store.records.set(cache_key, record)
+        return record
+
+    def __contains__(self, key: object) -> bool:
+        return bool(self.digest(key))  # type: ignore
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._store.query_all(self._keys))  # type: ignore
+
+    def __len__(self) -> int:
+        return len(self._store.query_all(self._keys))
+
+    def digest(self, key: K) -> str:
+        """获取记录摘要。记录内容变化时摘要随之变化
+
+        * ``param key: K`` 记录键
+        - ``return: str`` 记录摘要。记录不存在时为空字符串
+        """
+
+        try:
+            params = self._to_params(key)
+        except (TypeError, ValueError):
+            return ""
+        row = self._store.query(self._select_digest, params)
+        return row[0] if row else ""
+
+
+class HHWStore:
+    """Honey Hunter World 深渊解析数据索引存储
+
+    深渊解析数据在写入时完成校验，按层变种与日程分别存入 SQLite 数据库。
+    读取时仅查询所需记录并跳过校验直接构造，已解析的记录保留在定长 LRU 缓存中，
+    冷启动耗时与常驻内存不随历史日程数量增长
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        * ``param path: Path`` 数据库文件路径
+        """
+
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._lock = Lock()
+        self.records: LRUCache[BaseModel] = LRUCache(RECORD_CACHE_SIZE)
+        """已解析记录缓存"""
+
+        self.meta: Dict[str, str] = dict(self.query_all("SELECT key, value FROM meta"))
+        """存储元数据。包括数据版本与上游 ``ETag`` 等"""
+        self.version = self.meta.get("version", "")
+        """数据版本。为原始数据摘要"""
+        self.default_variants: Dict[int, int] = {
+            int(floor_id): variant_id
+            for floor_id, variant_id in json.loads(
+                self.meta.get("default_variants", "{}")
+            ).items()
+        }
+        """各层首个变种 ID。用于不随日程变化的第 1 至 8 层"""
+        self.variants: RecordTable[Tuple[int, int], VariantModel] = RecordTable(
+            self,
+            partial(construct_trusted, VariantModel),
+            "variants",
+            ("floor", "variant"),
+            lambda key: (int(key[0]), int(key[1])),
+        )
+        """深境螺旋单层变种数据。以 ``(层 ID, 变种 ID)`` 为键"""
+        self.schedules: RecordTable[str, ScheduleItemModel] = RecordTable(
+            self,
+            partial(construct_trusted, ScheduleItemModel),
+            "schedules",
+            ("key",),
+            lambda key: (str(key),),
+        )
+        """深境螺旋日程数据。以日程数据键值为键"""
+
+    @property
+    def ready(self) -> bool:
+        """存储是否已写入可用数据"""
+
+        return bool(self.version)
+
+    def connect(self) -> sqlite3.Connection:
+        """获取数据库连接。连接由各线程共享，进程派生后重新连接"""
+
+        if self._conn is None or self._pid != os.getpid():
+            # 派生的子进程不可沿用父进程的连接与锁
+            self._lock = Lock()
+            self._conn = connect(self.path)
+            self._pid = os.getpid()
+        return self._conn
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> Optional[Tuple]:
+        """查询单行"""
+
+        conn = self.connect()
+        with self._lock:
+            return conn.execute(sql, params).fetchone()
+
+    def query_all(self, sql: str, params: Sequence[Any] = ()) -> List[Any]:
+        """查询全部行。单列结果展开为值列表"""
+
+        conn = self.connect()
+        with self._lock:
+            rows = conn.execute(sql, params).fetchall()
+        return [row[0] if len(row) == 1 else tuple(row) for row in rows]
+
+    def set_meta(self, values: Dict[str, str]) -> None:
+        """写入存储元数据
+
+        * ``param values: Dict[str, str]`` 元数据
+        """
+
+        conn = self.connect()
+        with self._lock, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                list(values.items()),
+            )
+        self.meta.update(values)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """打开数据库并确保存储结构存在。结构版本不一致时清空旧数据
+
+    * ``param path: Path`` 数据库文件路径
+    - ``return: sqlite3.Connection`` 数据库连接
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    # WAL 模式下写入时不阻塞读取
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+    if row is None or row[0] != SCHEMA_VERSION:
+        with conn:
+            conn.execute("DELETE FROM variants")
+            conn.execute("DELETE FROM schedules")
+            conn.execute("DELETE FROM meta")
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('schema', ?)", (SCHEMA_VERSION,)
+            )
+    return conn
+
+
+def _validate(model: Type[BaseModel], name: str, raw: Dict[str, Any]) -> Optional[str]:
+    """校验单条记录
+
+    - ``return: Optional[str]`` 经校验器转换的记录文本，读取时无需再次校验。未通过校验时为空
+    """  # noqa: E501
+
+    try:
+        record = model.parse_obj(raw)
+    except ValidationError as e:
+        logger.warning(f"HHW 深渊数据{name}解析失败：{e}")
+        return None
+    return record.json(ensure_ascii=False)
+
+
+def write_store(
+    path: Path,
+    data: Dict[str, Dict[str, Dict[str, Any]]],
+    version: str,
+    meta: Optional[Dict[str, str]] = None,
+) -> Set[str]:
+    """增量写入深渊解析数据。仅校验并替换内容变化的记录，全部变化在单个事务中提交
+
+    * ``param path: Path`` 数据库文件路径
+    * ``param data: Dict[str, Dict[str, Dict[str, Any]]]`` 深渊解析数据
+    * ``param version: str`` 数据版本
+    * ``param meta: Optional[Dict[str, str]] = None`` 一并写入的元数据。如上游 ``ETag``
+    - ``return: Set[str]`` 内容变化或已移除的记录的旧摘要
+    """
+
+    time_start = perf_counter()
+    conn = connect(path)
+    try:
+        old_variants: Dict[Tuple[int, int], str] = {
+            (floor_id, variant_id): digest
+            for floor_id, variant_id, digest in conn.execute(
+                "SELECT floor, variant, digest FROM variants"
+            )
+        }
+        old_schedules: Dict[str, str] = dict(
+            conn.execute("SELECT key, digest FROM schedules").fetchall()
+        )
+
+        variant_rows, variant_keys = [], set()
+        default_variants: Dict[int, int] = {}
+        for floor_key, variants in data["Floor"].items():
+            for variant_key, variant in variants.items():
+                key = (int(floor_key), int(variant_key))
+                digest = record_digest(
+                    json.dumps(variant, ensure_ascii=False, sort_keys=True)
+                )
+                # 未变化的记录已在此前写入时校验
+                if old_variants.get(key) != digest:
+                    text = _validate(
+                        VariantModel, f" {floor_key} 层变种 {variant_key} ", variant
+                    )
+                    if text is None:
+                        continue
+                    variant_rows.append((*key, digest, text))
+                variant_keys.add(key)
+                default_variants.setdefault(*key)
+        schedule_rows, schedule_keys = [], set()
+        for schedule_key, schedule in data["Schedule"].items():
+            digest = record_digest(
+                json.dumps(schedule, ensure_ascii=False, sort_keys=True)
+            )
+            if old_schedules.get(schedule_key) != digest:
+                text = _validate(ScheduleItemModel, f"日程 {schedule_key} ", schedule)
+                if text is None:
+                    continue
+                schedule_rows.append((schedule_key, digest, text))
+            schedule_keys.add(schedule_key)
+
+        removed_variants = old_variants.keys() - variant_keys
+        removed_schedules = old_schedules.keys() - schedule_keys
+        stale = {
+            old_variants[key]
+            for key in [*removed_variants, *(row[:2] for row in variant_rows)]
+            if key in old_variants
+        } | {
+            old_schedules[key]
+            for key in [*removed_schedules, *(row[0] for row in schedule_rows)]
+            if key in old_schedules
+        }
+        with conn:
+            conn.executemany(
+                "DELETE FROM variants WHERE floor = ? AND variant = ?",
+                list(removed_variants),
+            )
+            conn.executemany(
+                "DELETE FROM schedules WHERE key = ?",
+                [(key,) for key in removed_schedules],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO variants VALUES (?, ?, ?, ?)", variant_rows
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO schedules VALUES (?, ?, ?)", schedule_rows
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    ("version", version),
+                    ("default_variants", json.dumps(default_variants)),
+                    *(meta or {}).items(),
+                ],
+            )
+    finally:
+        conn.close()
+
+    logger.info(
+        f"HHW 深渊数据已写入索引存储：变种 {len(variant_keys)} 个，"
+        f"日程 {len(schedule_keys)} 个，其中新增或变化 {len(variant_rows)} 个变种、"
+        f"{len(schedule_rows)} 个日程，移除 {len(removed_variants)} 个变种、"
+        f"{len(removed_schedules)} 个日程，耗时 {(perf_counter() - time_start) * 1000:.1f}ms"
+    )
+    return stale
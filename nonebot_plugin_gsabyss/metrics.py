@@ -0,0 +1,245 @@
+from functools import wraps
+from time import perf_counter
+from bisect import bisect_left
+from threading import Lock, Thread
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, List, Tuple, TypeVar, Callable, Iterator, Optional
+
+from yarl import URL
+from nonebot import get_driver
+from nonebot.log import logger
+from nonebot.drivers import Request, Response, ReverseDriver, HTTPServerSetup
+
+from .config import plugin_config
+
+T = TypeVar("T")
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""耗时直方图分桶上界，单位秒"""
+
+METRICS_PATH = "/gsabyss/metrics"
+"""指标导出路径"""
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+"""Prometheus 文本格式内容类型"""
+
+COUNTER_KEYS = {
+    "hits",
+    "misses",
+    "disk_hits",
+    "coalesced",
+    "stale_hits",
+    "not_modified",
+}
+"""缓存统计数据中按累计计数导出的键"""
+
+
+class Histogram:
+    """耗时直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        """各分桶计数，不累加"""
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """记录一次耗时"""
+
+        idx = bisect_left(self.buckets, value)
+        if idx < len(self.buckets):
+            self.counts[idx] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """插件运行指标。记录各阶段与各命令耗时，汇总已注册缓存的统计数据
+
+    绘图进程中的阶段耗时不会回传主进程，启用多进程绘图时仅记录主进程内的阶段
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._caches: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = Lock()
+
+    def observe(self, metric: str, label: str, seconds: float) -> None:
+        """记录一次耗时
+
+        * ``param metric: str`` 指标类型。``stage`` 为阶段耗时，``command`` 为命令耗时
+        * ``param label: str`` 阶段或命令名称
+        * ``param seconds: float`` 耗时，单位秒
+        """
+
+        with self._lock:
+            histogram = self._histograms.get((metric, label))
+            if histogram is None:
+                histogram = self._histograms[(metric, label)] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, metric: str, label: str) -> Iterator[None]:
+        """记录代码块耗时。代码块抛出异常时同样记录"""
+
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(metric, label, perf_counter() - start)
+
+    def stage(self, name: str):
+        """记录阶段耗时的上下文管理器
+
+        * ``param name: str`` 阶段名称。形如 ``quickview.draw_header``
+        """
+
+        return self.timer("stage", name)
+
+    def timed(self, name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+        """记录同步函数耗时的装饰器
+
+        * ``param name: str`` 阶段名称
+        """
+
+        def decorator(func: Callable[..., T]) -> Callable[..., T]:
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> T:
+                with self.stage(name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+        """注册缓存统计数据
+
+        * ``param name: str`` 缓存名称
+        * ``param stats: Callable[[], Dict[str, Any]]`` 获取统计数据的函数
+        """
+
+        self._caches[name] = stats
+
+    def export(self) -> str:
+        """导出 Prometheus 文本格式指标"""
+
+        lines: List[str] = []
+        with self._lock:
+            histograms = sorted(
+                (key, (list(h.counts), h.sum, h.count, h.buckets))
+                for key, h in self._histograms.items()
+            )
+        for metric, help_text in [("stage", "各阶段耗时"), ("command", "各命令响应耗时")]:
+            name = f"gsabyss_{metric}_seconds"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (_metric, label), (counts, total, count, buckets) in histograms:
+                if _metric != metric:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f'{name}_bucket{{{metric}="{label}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'{name}_bucket{{{metric}="{label}",le="+Inf"}} {count}')
+                lines.append(f'{name}_sum{{{metric}="{label}"}} {total:.6f}')
+                lines.append(f'{name}_count{{{metric}="{label}"}} {count}')
+
+        samples: Dict[str, List[str]] = {}
+        for cache_name, stats in sorted(self._caches.items()):
+            for key, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"gsabyss_cache_{key}" + (
+                    "_total" if key in COUNTER_KEYS else ""
+                )
+                samples.setdefault(name, []).append(
+                    f'{name}{{cache="{cache_name}"}} {value}'
+                )
+        for name, values in samples.items():
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines += [f"# TYPE {name} {kind}", *values]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+"""插件运行指标"""
+
+
+def lru_cache_stats(func: Any) -> Callable[[], Dict[str, Any]]:
+    """``functools.lru_cache`` 缓存统计数据，与 ``LRUCache.stats`` 字段一致
+
+    * ``param func: Any`` 经 ``lru_cache`` 装饰的函数
+    """
+
+    def stats() -> Dict[str, Any]:
+        info = func.cache_info()
+        return {
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+        }
+
+    return stats
+
+
+async def _handle_metrics(request: Request) -> Response:
+    return Response(
+        200, headers={"Content-Type": CONTENT_TYPE}, content=metrics.export()
+    )
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != METRICS_PATH:
+            self.send_error(404)
+            return
+        body = metrics.export().encode("UTF-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+driver = get_driver()
+_server: Optional[ThreadingHTTPServer] = None
+
+if plugin_config.gsabyss_metrics:
+    if isinstance(driver, ReverseDriver):
+        driver.setup_http_server(
+            HTTPServerSetup(
+                URL(METRICS_PATH), "GET", "gsabyss_metrics", _handle_metrics
+            )
+        )
+    else:
+        logger.warning("当前驱动器不支持 HTTP 服务端，请通过独立端口导出指标")
+
+
+@driver.on_startup
+async def start_metrics_server() -> None:
+    """启动时在独立端口导出指标"""
+
+    global _server
+    port = plugin_config.gsabyss_metrics_port
+    if not port:
+        return
+    _server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+    Thread(target=_server.serve_forever, name="gsabyss-metrics", daemon=True).start()
+    logger.info(f"插件运行指标已导出至 http://127.0.0.1:{port}{METRICS_PATH}")
+
+
+@driver.on_shutdown
+async def stop_metrics_server() -> None:
+    """关闭时停止独立端口指标导出"""
+
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
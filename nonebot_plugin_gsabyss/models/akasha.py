@@ -1,7 +1,13 @@
-from typing import List, Literal
+from typing import Any, Dict, List, Literal
 
 from pydantic import BaseModel
 
+TOP_TEAMS = 5
+"""深渊统计图绘制的上半、下半热门队伍数量"""
+
+TOP_CHARACTERS = 30
+"""深渊统计图绘制的角色数量"""
+
 
 class TeamItem(BaseModel):
     """队伍数据"""
@@ -138,8 +144,8 @@ class CharacterItem(BaseModel):
     """稀有度"""
 
 
-class AkashaAbyssData(BaseModel):
-    """虚空数据库深渊统计数据"""
+class AkashaRenderData(BaseModel):
+    """虚空数据库深渊统计数据中深渊统计图所需的部分"""
 
     schedule_id: int
     """深渊版本 ID"""
@@ -147,17 +153,58 @@ class AkashaAbyssData(BaseModel):
     """更新时间。格式为 `%Y-%m-%d %H:%M`"""
     schedule_version_desc: str
     """深渊版本描述"""
-    team_list: List[TeamItem]
-    """队伍列表。按数量排序"""
     team_up_list: List[TeamItem]
-    """上半队伍列表。按上半数量排序"""
+    """上半队伍列表。按上半数量排序，绘图时使用前 `TOP_TEAMS` 个"""
     team_down_list: List[TeamItem]
-    """下半队伍列表。按下半数量排序"""
+    """下半队伍列表。按下半数量排序，绘图时使用前 `TOP_TEAMS` 个"""
     abyss_total_view: AbyssTotalView
     """深渊数据汇总数据"""
     last_rate: LastRate
     """深渊数据汇总相比上期变化数据"""
+    character_used_list: List[CharacterItem]
+    """角色列表。按使用率排序，绘图时使用前 `TOP_CHARACTERS` 个及热门队伍中的角色"""
+
+
+class AkashaAbyssData(AkashaRenderData):
+    """虚空数据库深渊统计数据"""
+
+    team_list: List[TeamItem]
+    """队伍列表。按数量排序"""
     level_data: LevelData
     """参与统计玩家等级数据"""
-    character_used_list: List[CharacterItem]
-    """角色列表。按使用率排序"""
+
+
+def select_render_fields(obj: Dict[str, Any]) -> Dict[str, Any]:
+    """从深渊统计原始数据中选取深渊统计图所需的字段，不复制其余数据
+
+    * ``param obj: Dict[str, Any]`` 深渊统计原始数据
+    - ``return: Dict[str, Any]`` 可由 ``AkashaRenderData`` 解析的数据
+    """
+
+    team_up_list = obj["team_up_list"][:TOP_TEAMS]
+    team_down_list = obj["team_down_list"][:TOP_TEAMS]
+    # 热门队伍中的角色图标需要在完整角色列表中查找
+    team_chars = {
+        10000000 + short_id
+        for team in [*team_up_list, *team_down_list]
+        for short_id in team.get("tl", [])
+    }
+    return {
+        **{
+            key: obj[key]
+            for key in [
+                "schedule_id",
+                "modify_time",
+                "schedule_version_desc",
+                "abyss_total_view",
+                "last_rate",
+            ]
+        },
+        "team_up_list": team_up_list,
+        "team_down_list": team_down_list,
+        "character_used_list": [
+            char
+            for idx, char in enumerate(obj["character_used_list"])
+            if idx < TOP_CHARACTERS or char.get("avatar_id") in team_chars
+        ],
+    }
@@ -0,0 +1,79 @@
+from typing import (
+    Any,
+    Dict,
+    List,
+    Type,
+    Union,
+    TypeVar,
+    Callable,
+    Optional,
+    get_args,
+    get_origin,
+)
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+NoneType = type(None)
+
+_builders: Dict[Type[BaseModel], Callable[[Dict[str, Any]], Any]] = {}
+
+
+def _converter(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """根据字段类型生成嵌套模型的构造函数。无需转换时返回空"""
+
+    origin = get_origin(annotation)
+    if origin in (list, List):
+        item = _converter(get_args(annotation)[0])
+        if item is None:
+            return None
+        return lambda value: [item(v) for v in value]
+    if origin is Union:
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        return _converter(args[0]) if len(args) == 1 else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _builder(annotation)
+    return None
+
+
+def _builder(model: Type[M]) -> Callable[[Dict[str, Any]], M]:
+    """生成并缓存模型的构造函数"""
+
+    if model in _builders:
+        return _builders[model]  # type: ignore
+
+    # 所有实例共享同一字段集合。字段均已设置，写入已有字段时集合不变
+    fields_set = set(model.__fields__)
+    converters: List[Any] = []
+
+    def build(data: Dict[str, Any]) -> M:
+        values = {}
+        for name, convert in converters:
+            value = data[name]
+            values[name] = value if convert is None or value is None else convert(value)
+        obj = model.__new__(model)
+        object.__setattr__(obj, "__dict__", values)
+        object.__setattr__(obj, "__fields_set__", fields_set)
+        return obj
+
+    # 先登记再生成字段转换函数，以支持自引用模型
+    _builders[model] = build
+    converters.extend(
+        (name, _converter(field.outer_type_))
+        for name, field in model.__fields__.items()
+    )
+    return build
+
+
+def construct_trusted(model: Type[M], data: Dict[str, Any]) -> M:
+    """不经校验地构造已校验过的数据，递归构造嵌套模型
+
+    数据需为同一模型 ``.dict()`` 的结果，即以字段名为键、已经过各校验器转换。
+    仅用于写入时已完整校验的数据，外部数据仍需使用 ``parse_obj``
+
+    * ``param model: Type[M]`` 模型类型
+    * ``param data: Dict[str, Any]`` 已校验数据
+    - ``return: M`` 模型实例
+    """
+
+    return _builder(model)(data)
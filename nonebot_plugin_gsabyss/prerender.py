@@ -0,0 +1,102 @@
+from datetime import datetime
+from time import perf_counter
+from typing import Union, Optional
+
+from nonebot import require
+from nonebot.log import logger
+from nonebot.utils import run_sync
+
+from .config import plugin_config
+from .cache import quickview_cache
+from .data_source import TZ, hhw_dataset, get_schedule_key
+from .draw_quickview import AbyssQuickViewDraw, AbyssBatchQuickViewDraw
+
+require("nonebot_plugin_apscheduler")
+from nonebot_plugin_apscheduler import scheduler  # noqa: E402
+
+PRERENDER_FLOORS = range(9, 13)
+"""预先绘制的深境螺旋层 ID"""
+
+PRERENDER_CHAMBERS = range(0, 4)
+"""预先绘制的深境螺旋间 ID。``0`` 为全层"""
+
+
+def _has_schedule(schedule_key: str) -> bool:
+    """深境螺旋日程是否已有数据。涉及数据库读取，需在线程池中调用"""
+
+    return schedule_key in hhw_dataset.index.schedules
+
+
+def _is_cached(drawer: Union[AbyssQuickViewDraw, AbyssBatchQuickViewDraw]) -> bool:
+    """速览图是否已缓存。涉及数据库与磁盘读取，需在线程池中调用"""
+
+    return quickview_cache.get(drawer.cache_key) is not None
+
+
+async def prerender_quickview(at: Optional[datetime] = None) -> None:
+    """预先绘制本期与下期第 9 至 12 层的全层、各间及多层速览图，跳过已缓存的速览图
+
+    * ``param at: Optional[datetime] = None`` 基准时间，据此确定本期与下期。默认为当前时间
+    """  # noqa: E501
+
+    if not plugin_config.gsabyss_prerender:
+        return
+
+    total = 2 * (len(PRERENDER_FLOORS) * len(PRERENDER_CHAMBERS) + 1)
+    if quickview_cache.memory.maxsize < total:
+        logger.warning(
+            f"深渊速览图内存缓存数量 {quickview_cache.memory.maxsize} 小于预先绘制数量 {total}，"
+            "部分预先绘制的速览图将被淘汰"
+        )
+
+    start, rendered, incomplete = perf_counter(), 0, 0
+    for period in ["now", "next"]:
+        schedule_key = get_schedule_key(period, at)  # type: ignore
+        if not await run_sync(_has_schedule)(schedule_key):
+            logger.debug(f"深境螺旋日程 {schedule_key} 暂无数据，跳过预先绘制")
+            continue
+        for floor_id in PRERENDER_FLOORS:
+            for chamber_id in PRERENDER_CHAMBERS:
+                drawer = AbyssQuickViewDraw(floor_id, chamber_id, schedule_key)
+                if await run_sync(_is_cached)(drawer):
+                    continue
+                if isinstance(await drawer.get_full_picture(), str):
+                    break
+                rendered += 1
+                incomplete += not drawer.complete
+        # 多层速览图复用上方已绘制的单间图像
+        batch = AbyssBatchQuickViewDraw(list(PRERENDER_FLOORS), schedule_key)
+        if not await run_sync(_is_cached)(batch) and not isinstance(
+            await batch.get_full_picture(), str
+        ):
+            rendered += 1
+            incomplete += not batch.complete
+
+    if rendered:
+        logger.info(
+            f"已预先绘制深渊速览图 {rendered} 张，耗时 {perf_counter() - start:.1f} 秒"
+            + (f"，其中 {incomplete} 张素材不完整未缓存" if incomplete else "")
+        )
+
+
+@hhw_dataset.on_update
+async def prerender_after_update() -> None:
+    """深渊数据加载或更新后预先绘制本期与下期速览图"""
+
+    await prerender_quickview()
+
+
+@scheduler.scheduled_job(
+    "cron",
+    day="1,16",
+    hour=3,
+    minute=30,
+    name="PrerenderQuickView",
+    misfire_grace_time=None,
+    timezone="Asia/Shanghai",
+)
+async def prerender_before_reset() -> None:
+    """深境螺旋日程切换前预先绘制切换后的本期与下期速览图"""
+
+    reset_time = datetime.now(TZ).replace(hour=4, minute=0, second=0, microsecond=0)
+    await prerender_quickview(reset_time)
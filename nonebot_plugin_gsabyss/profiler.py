@@ -0,0 +1,142 @@
+import json
+import cProfile
+import tracemalloc
+from re import sub
+from threading import Lock
+from datetime import datetime
+from time import thread_time, perf_counter
+from typing import Any, TypeVar, Callable, Optional
+
+from nonebot.log import logger
+
+from .config import ProfileMode, plugin_config
+
+T = TypeVar("T")
+
+PROFILE_DIR = plugin_config.gsabyss_dir / "profile"
+"""性能分析结果目录"""
+
+
+class RenderProfiler:
+    """绘图性能分析。开启后接下来的若干次绘图将被记录
+
+    每次绘图生成同名的 ``.json`` 说明文件，包含绘图参数与耗时；
+    ``cprofile`` 模式另生成 ``.prof`` 文件，可用 ``snakeviz`` 等工具查看；
+    ``tracemalloc`` 模式另生成 ``.snapshot`` 文件，可用 ``tracemalloc.Snapshot.load`` 读取。
+    ``tracemalloc`` 统计整个进程的内存分配，并发绘图时结果会相互混杂
+    """
+
+    def __init__(self, count: int = 0, mode: ProfileMode = "cprofile") -> None:
+        """
+        * ``param count: int = 0`` 待记录的绘图次数
+        * ``param mode: ProfileMode = "cprofile"`` 分析方式
+        """
+
+        self.remaining = count
+        """剩余待记录的绘图次数"""
+        self.mode: ProfileMode = mode
+        """分析方式"""
+        self._lock = Lock()
+        self._run_lock = Lock()
+
+    @property
+    def armed(self) -> bool:
+        """是否有待记录的绘图"""
+
+        return self.remaining > 0
+
+    def arm(self, count: int, mode: ProfileMode) -> None:
+        """开启性能分析
+
+        * ``param count: int`` 待记录的绘图次数。为 ``0`` 时关闭
+        * ``param mode: ProfileMode`` 分析方式
+        """
+
+        with self._lock:
+            self.remaining, self.mode = count, mode
+
+    def _take(self) -> Optional[ProfileMode]:
+        with self._lock:
+            if self.remaining <= 0:
+                return None
+            self.remaining -= 1
+            return self.mode
+
+    def run(self, label: str, func: Callable[..., T], *args: Any) -> T:
+        """执行绘图函数。有待记录的绘图时记录本次绘图
+
+        * ``param label: str`` 绘图标签。包含命令与绘图参数
+        * ``param func: Callable[..., T]`` 同步绘图函数
+        * ``param *args: Any`` 绘图函数参数
+        - ``return: T`` 绘图函数返回值
+        """
+
+        mode = self._take()
+        if mode is None:
+            return func(*args)
+
+        # 同一时间只记录一次绘图，避免多个分析器冲突
+        with self._run_lock:
+            profile = cProfile.Profile() if mode in ("cprofile", "both") else None
+            trace = mode in ("tracemalloc", "both")
+            # 已由其他代码开启时不关闭
+            started_trace = trace and not tracemalloc.is_tracing()
+            if started_trace:
+                tracemalloc.start()
+            elif trace and hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+
+            wall_start, cpu_start = perf_counter(), thread_time()
+            if profile:
+                profile.enable()
+            try:
+                return func(*args)
+            finally:
+                if profile:
+                    profile.disable()
+                wall, cpu = perf_counter() - wall_start, thread_time() - cpu_start
+                snapshot, peak = None, 0
+                if trace:
+                    snapshot = tracemalloc.take_snapshot()
+                    peak = tracemalloc.get_traced_memory()[1]
+                    if started_trace:
+                        tracemalloc.stop()
+                self._dump(label, mode, wall, cpu, peak, profile, snapshot)
+
+    def _dump(
+        self,
+        label: str,
+        mode: ProfileMode,
+        wall: float,
+        cpu: float,
+        peak: int,
+        profile: Optional[cProfile.Profile],
+        snapshot: Optional[tracemalloc.Snapshot],
+    ) -> None:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        safe_label = sub(r"[^\w.-]+", "_", label)
+        stem = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{safe_label}"
+        info = {
+            "label": label,
+            "mode": mode,
+            "wall_ms": round(wall * 1000, 3),
+            "cpu_ms": round(cpu * 1000, 3),
+        }
+        if profile:
+            profile.dump_stats(PROFILE_DIR / f"{stem}.prof")
+        if snapshot:
+            snapshot.dump(str(PROFILE_DIR / f"{stem}.snapshot"))
+            info["peak_kib"] = round(peak / 1024, 1)
+        (PROFILE_DIR / f"{stem}.json").write_text(
+            json.dumps(info, ensure_ascii=False, indent=2), encoding="UTF-8"
+        )
+        logger.info(
+            f"绘图 {label} 性能分析已保存至 {PROFILE_DIR / stem}.*，"
+            f"耗时 {info['wall_ms']} ms，剩余 {self.remaining} 次"
+        )
+
+
+profiler = RenderProfiler(
+    plugin_config.gsabyss_profile_renders, plugin_config.gsabyss_profile_mode
+)
+"""绘图性能分析"""
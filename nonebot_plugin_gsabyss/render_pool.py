@@ -0,0 +1,131 @@
+import asyncio
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, TypeVar, Callable, Optional
+
+import nonebot
+from nonebot import get_driver
+from nonebot.log import logger
+from nonebot.utils import run_sync
+
+from .config import plugin_config
+from .draw_utils import warm_fonts
+
+T = TypeVar("T")
+
+
+def _init_worker() -> None:
+    """绘图进程预热。预先加载字体与图标，初始化资源尚未下载时跳过"""
+
+    try:
+        warm_fonts()
+    except OSError:
+        pass
+
+
+def _worker_config() -> Dict[str, Any]:
+    """绘图进程初始化 NoneBot 所需的配置。仅包含驱动器、日志等级与本插件配置"""
+
+    config = get_driver().config.dict()
+    return {
+        key: value
+        for key, value in config.items()
+        if key in ("driver", "log_level") or key.startswith("gsabyss_")
+    }
+
+
+class RenderPool:
+    """多进程绘图后端。绘图进程数为 0 时在线程池中绘图
+
+    绘图进程以 spawn 方式启动，不继承主进程的线程、锁与数据库连接。
+    绘图进程以主进程配置初始化 NoneBot，首次执行任务时导入本插件，
+    单间图像、已缩放图标与阶段耗时统计等缓存各进程独立，不与主进程共享
+    """
+
+    def __init__(self, workers: int) -> None:
+        """
+        * ``param workers: int`` 绘图进程数
+        """
+
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用多进程绘图"""
+
+        return self.workers > 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # fork 会将其他线程持有的锁原样复制到子进程，因此使用 spawn 启动
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=partial(nonebot.init, **_worker_config()),
+            )
+            logger.info(f"已启动 {self.workers} 个绘图进程")
+        return self._executor
+
+    async def prime(self) -> None:
+        """启动全部绘图进程并预热，首次绘图无需等待进程启动与插件导入"""
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, _init_worker)
+                    for _ in range(self.workers)
+                )
+            )
+        except BrokenProcessPool as e:
+            logger.opt(exception=e).error("绘图进程启动失败，将在首次绘图时重试")
+            self.shutdown()
+
+    async def submit(self, func: Callable[..., T], *args: Any) -> T:
+        """在绘图进程中执行绘图任务。绘图进程异常退出时重建进程池并在线程池中重试
+
+        * ``param func: Callable[..., T]`` 模块级绘图函数，参数与返回值需可序列化
+        * ``param *args: Any`` 绘图函数参数
+        - ``return: T`` 绘图函数返回值
+        """
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool as e:
+            logger.opt(exception=e).error("绘图进程异常退出，已重建进程池")
+            self.shutdown()
+            return await run_sync(func)(*args)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """关闭绘图进程
+
+        * ``param wait: bool = False`` 是否等待绘图进程退出
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+render_pool = RenderPool(plugin_config.gsabyss_render_workers)
+"""多进程绘图后端"""
+
+
+@get_driver().on_startup
+async def start_render_pool() -> None:
+    """启动时在后台启动绘图进程，不阻塞启动"""
+
+    if render_pool.enabled:
+        asyncio.create_task(render_pool.prime())
+
+
+@get_driver().on_shutdown
+async def close_render_pool() -> None:
+    """关闭时结束绘图进程"""
+
+    await run_sync(render_pool.shutdown)(wait=True)